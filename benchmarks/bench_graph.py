@@ -0,0 +1,201 @@
+"""Benchmark full propagate runs with scripted LLMs and synthetic data.
+
+Runs TradingAgentsGraph end to end without network access: the deep/quick
+models are ScriptedChatModel instances, the dataflows read fixtures written
+by benchmarks.fixtures, memories use the numpy backend with hashing
+embeddings. Every combination of analyst selection and debate depth is run
+``--runs`` times and reported as per-stage time (from the graph's
+MetricsRecorder), both summed over the stage's nodes and as elapsed wall
+time, which is lower when they ran in parallel, plus call counts and peak
+Python heap allocation.
+
+Usage:
+    python -m benchmarks.bench_graph --analysts market market,news \\
+        market,social,news,fundamentals --depths 1 2 3 --runs 3 --latency 0.05
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+from benchmarks.fake_llm import ScriptedChatModel
+from benchmarks.fixtures import write_fixtures
+
+# Graph node name (prefix) -> reported stage
+STAGES = [
+    ("Analysts", ("Market Analyst", "Social Analyst", "News Analyst", "Fundamentals Analyst", "Msg Clear")),
+    ("Tools", ("tools_",)),
+    ("Digest", ("Report Digest",)),
+    ("Memory", ("Memory Prefetch",)),
+    ("Research debate", ("Bull Researcher", "Bear Researcher")),
+    ("Research manager", ("Research Manager",)),
+    ("Research trader", ("Research Trader",)),
+    ("Trader", ("Trader",)),
+    ("Risk debate", ("Risky Analyst", "Safe Analyst", "Neutral Analyst")),
+    ("Risk judge", ("Risk Judge",)),
+]
+
+
+def stage_of(node):
+    for stage, prefixes in STAGES:
+        if node.startswith(prefixes):
+            return stage
+    return "Other"
+
+
+class ScriptedTradingAgentsGraph(TradingAgentsGraph):
+    """TradingAgentsGraph whose models are ScriptedChatModel instances."""
+
+    scripted_options = {}
+
+    def _create_llm(self, model):
+        return ScriptedChatModel(model_name=model, **self.scripted_options)
+
+
+def make_config(data_dir, depth, tool_llm=None, early_stop=False):
+    config = DEFAULT_CONFIG.copy()
+    config.update(
+        {
+            "data_dir": data_dir,
+            "online_tools": False,
+            "max_debate_rounds": depth,
+            "max_risk_discuss_rounds": depth,
+            # Scripted debaters always agree, which would end every debate
+            # after one round
+            "debate_early_stop": early_stop,
+            "memory_dir": None,
+            "memory_backend": "numpy",
+            "embedding_function": "hashing",
+            "embedding_cache": False,
+            "analyst_tool_llm": {"default": tool_llm} if tool_llm else {},
+        }
+    )
+    return config
+
+
+def run_case(analysts, depth, args, data_dir):
+    config = make_config(data_dir, depth, args.tool_llm, args.early_stop)
+    config["graph_profile"] = args.profile
+    if args.compact_tool_results:
+        config["compact_tool_results"] = True
+        config["compact_tool_results_chars"] = args.compact_tool_results
+    ScriptedTradingAgentsGraph.scripted_options = {
+        "latency": args.latency,
+        "response_chars": args.response_chars,
+        "tool_rounds": args.tool_rounds,
+    }
+
+    start = time.perf_counter()
+    graph = ScriptedTradingAgentsGraph(analysts, config=config)
+    build_seconds = time.perf_counter() - start
+
+    results = []
+    for i in range(args.runs):
+        tracemalloc.start()
+        graph.propagate(args.ticker, args.date)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        run = graph.metrics.last_run()
+        stages, stage_nodes = {}, {}
+        for node, summary in run.node_summary().items():
+            stages[stage_of(node)] = stages.get(stage_of(node), 0.0) + summary["wall_time"]
+            stage_nodes.setdefault(stage_of(node), set()).add(node)
+        results.append(
+            {
+                "wall_time": run.wall_time,
+                "peak_mb": peak / 2**20,
+                # summed over the stage's node executions
+                "stages": stages,
+                # elapsed while any of them ran; lower when they overlap
+                "stages_wall": {stage: run.elapsed(nodes) for stage, nodes in stage_nodes.items()},
+                **run.totals(),
+            }
+        )
+    return build_seconds, results
+
+
+def report(analysts, depth, build_seconds, results):
+    median = lambda key: statistics.median(r[key] for r in results)
+    print(
+        f"\nanalysts={','.join(analysts)} depth={depth}: build {build_seconds * 1000:.0f} ms, "
+        f"run median {median('wall_time') * 1000:.0f} ms over {len(results)} runs, "
+        f"llm calls {results[-1]['llm_calls']}, tool calls {results[-1]['tool_calls']}, "
+        f"summed tool time {median('tool_time') * 1000:.0f} ms, "
+        f"prompt tokens {results[-1]['prompt_tokens']}, peak heap {median('peak_mb'):.1f} MB"
+    )
+    print(f"    {'':<18} {'summed':>12} {'wall':>12}")
+    for stage, _ in STAGES + [("Other", ())]:
+        times = [r["stages"][stage] for r in results if stage in r["stages"]]
+        walls = [r["stages_wall"][stage] for r in results if stage in r["stages_wall"]]
+        if times:
+            print(
+                f"    {stage:<18} {statistics.median(times) * 1000:9.1f} ms"
+                f" {statistics.median(walls) * 1000:9.1f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--analysts",
+        nargs="+",
+        default=["market", "market,social,news,fundamentals"],
+        help="comma-separated analyst selections",
+    )
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument("--response-chars", type=int, default=1500)
+    parser.add_argument("--tool-rounds", type=int, default=1)
+    parser.add_argument("--tool-llm", help="model name routed analyst tool-selection turns")
+    parser.add_argument("--early-stop", action="store_true", help="enable adaptive debate stopping")
+    parser.add_argument("--profile", choices=["full", "lite"], default="full", help="graph topology")
+    parser.add_argument(
+        "--compact-tool-results",
+        type=int,
+        metavar="CHARS",
+        help="shorten answered tool results in analyst loops to about CHARS",
+    )
+    parser.add_argument("--ticker", default="NVDA")
+    parser.add_argument("--date", default="2024-05-10")
+    parser.add_argument("--json", help="also write raw results to this path")
+    args = parser.parse_args()
+
+    output = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_fixtures(os.path.join(tmp, "data"), tickers=(args.ticker,))
+        # propagate() logs states under ./eval_results; keep them out of the tree
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            for selection in args.analysts:
+                analysts = selection.split(",")
+                for depth in args.depths:
+                    build_seconds, results = run_case(analysts, depth, args, data_dir)
+                    report(analysts, depth, build_seconds, results)
+                    output.append(
+                        {
+                            "analysts": analysts,
+                            "depth": depth,
+                            "build_seconds": build_seconds,
+                            "runs": results,
+                        }
+                    )
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
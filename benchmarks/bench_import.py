@@ -0,0 +1,78 @@
+"""Benchmark import time of the tradingagents entry points.
+
+Each target is imported in a fresh interpreter with ``-X importtime`` so
+results are not skewed by modules already cached in this process.
+
+Usage:
+    python -m benchmarks.bench_import --repeat 5 --top 15
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_TARGETS = [
+    "tradingagents.default_config",
+    "tradingagents.agents",
+    "tradingagents.dataflows",
+    "tradingagents.graph",
+    "tradingagents.graph.trading_graph",
+]
+
+
+def time_import(module):
+    """Wall time of importing module in a fresh interpreter, plus -X importtime log."""
+    code = f"import {module}" if module else "pass"
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return elapsed, proc.stderr
+
+
+def slowest_modules(importtime_log, top):
+    """Parse -X importtime output into the largest cumulative import times (us)."""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(cumulative_us), name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = statistics.median(time_import(None)[0] for _ in range(args.repeat))
+    print(f"interpreter startup: median {baseline * 1000:.0f} ms")
+
+    for module in args.targets:
+        try:
+            runs = [time_import(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module}: import failed ({e})")
+            continue
+
+        print(
+            f"{module}: median {statistics.median(r[0] for r in runs) * 1000:.0f} ms "
+            f"over {args.repeat} runs"
+        )
+        for cumulative_us, name in slowest_modules(runs[-1][1], args.top):
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the agent memory path in isolation, fully offline.
+
+Usage:
+    python -m benchmarks.bench_memory --sizes 100 1000 20000 --queries 200
+"""
+
+import argparse
+import random
+import time
+
+from tradingagents.agents.utils.memory import FinancialSituationMemory
+
+WORDS = (
+    "inflation rates yields earnings guidance revenue margin volatility momentum "
+    "breakout support resistance insider buying selling dividend buyback debt "
+    "cash flow valuation growth tech energy consumer staples utilities dollar "
+    "emerging markets rotation sentiment downgrade upgrade forecast recession"
+).split()
+
+
+def make_situation(rng, length=60):
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def run(size, queries, backend, seed=0):
+    rng = random.Random(seed)
+    config = {
+        "backend_url": "",
+        "memory_dir": None,
+        "memory_backend": backend,
+        "embedding_function": "hashing",
+        "embedding_cache": False,
+    }
+    memory = FinancialSituationMemory(f"bench_{backend}_{size}_{seed}", config)
+
+    start = time.perf_counter()
+    memory.add_situations(
+        [(make_situation(rng), f"advice {i}") for i in range(size)]
+    )
+    add_seconds = time.perf_counter() - start
+
+    situations = [make_situation(rng) for _ in range(queries)]
+    embeddings = memory.get_embeddings(situations)
+    start = time.perf_counter()
+    for embedding in embeddings:
+        memory.situation_collection.query(
+            query_embeddings=[embedding],
+            n_results=2,
+            include=["metadatas", "documents", "distances"],
+        )
+    query_ms = (time.perf_counter() - start) * 1000 / queries
+
+    print(
+        f"{backend:>6} size={size:>7}  add={add_seconds:8.3f}s  query={query_ms:8.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", default=["numpy"])
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        for size in args.sizes:
+            run(size, args.queries, backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Deterministic scripted chat model for offline benchmarks.
+
+ScriptedChatModel stands in for the deep/quick thinking LLMs. When tools are
+bound it answers the first ``tool_rounds`` turns of an analyst loop with tool
+calls whose arguments are synthesized from the tool schemas, then writes a
+report; every other prompt gets a fixed-size text answer ending in a
+parseable decision. No network access is involved, so a run's timings
+reflect the framework (graph, tools, memory, prompt assembly) alone plus an
+optional simulated model latency.
+"""
+
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# Tools that reach the network even in offline mode
+NETWORK_TOOLS = {"get_google_news"}
+
+INDICATORS = ["close_50_sma", "rsi", "macd", "boll", "atr", "vwma"]
+
+_TICKER = re.compile(r"company we want to look at is (\S+?)[.\s]")
+_DATE = re.compile(r"current date is (\d{4}-\d{2}-\d{2})")
+# Incremental analyst runs only ask for data since their previous report
+_SINCE = re.compile(r"new since (\d{4}-\d{2}-\d{2})")
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that replays a deterministic analyst/debater script."""
+
+    model_name: str = "scripted"
+    tool_rounds: int = 1
+    indicator_calls: int = 2
+    response_chars: int = 1500
+    decision: str = "BUY"
+    latency: float = 0.0
+    skip_tools: Sequence[str] = tuple(NETWORK_TOOLS)
+    ticker: str = "NVDA"
+    trade_date: str = "2024-05-10"
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        tools: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+
+        if tools and self._tool_turns(messages) < self.tool_rounds:
+            message = AIMessage(content="", tool_calls=self._tool_calls(messages, tools))
+        else:
+            message = AIMessage(content=self._text(messages))
+
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        message.usage_metadata = {
+            "input_tokens": prompt_chars // 4,
+            "output_tokens": len(message.content) // 4 + 20 * len(message.tool_calls),
+            "total_tokens": prompt_chars // 4
+            + len(message.content) // 4
+            + 20 * len(message.tool_calls),
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _tool_turns(self, messages: List[BaseMessage]) -> int:
+        """Tool-calling turns since the analyst loop started."""
+        turns = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, AIMessage) and message.tool_calls:
+                turns += 1
+        return turns
+
+    def _context(self, messages: List[BaseMessage]):
+        text = "\n".join(str(m.content) for m in messages if not isinstance(m, ToolMessage))
+        ticker = _TICKER.search(text)
+        trade_date = _DATE.search(text)
+        return (
+            ticker.group(1) if ticker else self.ticker,
+            trade_date.group(1) if trade_date else self.trade_date,
+        )
+
+    def _tool_calls(self, messages: List[BaseMessage], tools: List[dict]) -> List[dict]:
+        ticker, trade_date = self._context(messages)
+        since = _SINCE.search("\n".join(str(m.content) for m in messages))
+        current = datetime.strptime(trade_date, "%Y-%m-%d")
+        start = datetime.strptime(since.group(1), "%Y-%m-%d") if since else current - timedelta(days=30)
+        start_date = start.strftime("%Y-%m-%d")
+        values = {
+            "ticker": ticker,
+            "symbol": ticker,
+            "query": ticker,
+            "curr_date": trade_date,
+            "end_date": trade_date,
+            "start_date": start_date,
+            "freq": "quarterly",
+            "look_back_days": (current - start).days,
+        }
+
+        calls = []
+        for tool in tools:
+            function = tool["function"]
+            if function["name"] in self.skip_tools:
+                continue
+            params = function.get("parameters", {}).get("properties", {})
+            args = {name: values.get(name, "") for name in params}
+            indicators = INDICATORS[: self.indicator_calls] if "indicator" in params else [None]
+            for indicator in indicators:
+                if indicator is not None:
+                    args = dict(args, indicator=indicator)
+                calls.append(
+                    {
+                        "name": function["name"],
+                        "args": args,
+                        "id": f"call_{len(calls)}_{function['name']}",
+                        "type": "tool_call",
+                    }
+                )
+        return calls
+
+    def _text(self, messages: List[BaseMessage]) -> str:
+        ticker, trade_date = self._context(messages)
+        head = f"Scripted analysis of {ticker} for {trade_date}. "
+        tail = f"\n\nFINAL TRANSACTION PROPOSAL: **{self.decision}**"
+        body_len = max(0, self.response_chars - len(head) - len(tail))
+        filler = "The evidence is weighed point by point against the other side. "
+        body = (filler * (body_len // len(filler) + 1))[:body_len]
+        return head + body + tail
@@ -0,0 +1,160 @@
+"""Synthetic, deterministic data fixtures for every offline dataflow.
+
+write_fixtures() lays out a data_dir with the same file names and formats
+the offline tools in tradingagents.dataflows.interface read, so the full
+agent graph can run without network access or the real FR1 dataset.
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Offline price files are always named after this fixed range
+PRICE_START = "2015-01-01"
+PRICE_END = "2025-03-25"
+
+
+def _days(start: str, end: str):
+    day = datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def write_price_data(data_dir: str, ticker: str, rng: random.Random):
+    dates = pd.bdate_range(PRICE_START, PRICE_END)
+    close = 100.0
+    rows = []
+    for day in dates:
+        open_ = close
+        close = max(1.0, close * (1 + rng.gauss(0.0003, 0.02)))
+        high = max(open_, close) * (1 + abs(rng.gauss(0, 0.005)))
+        low = min(open_, close) * (1 - abs(rng.gauss(0, 0.005)))
+        rows.append(
+            {
+                "Date": day.strftime("%Y-%m-%d"),
+                "Open": round(open_, 2),
+                "High": round(high, 2),
+                "Low": round(low, 2),
+                "Close": round(close, 2),
+                "Adj Close": round(close, 2),
+                "Volume": rng.randint(1_000_000, 50_000_000),
+            }
+        )
+
+    path = os.path.join(data_dir, "market_data", "price_data")
+    os.makedirs(path, exist_ok=True)
+    pd.DataFrame(rows).to_csv(
+        os.path.join(path, f"{ticker}-YFin-data-{PRICE_START}-{PRICE_END}.csv"),
+        index=False,
+    )
+
+
+def write_finnhub_data(data_dir: str, ticker: str, start: str, end: str, rng: random.Random):
+    news, senti, trans = {}, {}, {}
+    for day in _days(start, end):
+        key = day.strftime("%Y-%m-%d")
+        news[key] = [
+            {
+                "headline": f"{ticker} headline {i} on {key}",
+                "summary": f"Synthetic summary {i} about {ticker} "
+                + "with enough words to look like a real news blurb. " * 3,
+            }
+            for i in range(3)
+        ]
+        senti[key] = [
+            {
+                "year": day.year,
+                "month": day.month,
+                "change": rng.randint(-50_000, 50_000),
+                "mspr": round(rng.uniform(-100, 100), 2),
+            }
+        ]
+        trans[key] = [
+            {
+                "filingDate": key,
+                "name": f"Insider {rng.randint(1, 9)}",
+                "change": rng.randint(-20_000, 20_000),
+                "share": rng.randint(10_000, 500_000),
+                "transactionPrice": round(rng.uniform(50, 500), 2),
+                "transactionCode": rng.choice(["S", "P", "M"]),
+            }
+        ]
+
+    for data_type, data in (
+        ("news_data", news),
+        ("insider_senti", senti),
+        ("insider_trans", trans),
+    ):
+        path = os.path.join(data_dir, "finnhub_data", data_type)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, f"{ticker}_data_formatted.json"), "w") as f:
+            json.dump(data, f)
+
+
+def write_simfin_data(data_dir: str, tickers, rng: random.Random):
+    statements = {
+        "balance_sheet": ("balance", ["Total Assets", "Total Liabilities", "Total Equity"]),
+        "cash_flow": ("cashflow", ["Net Cash from Operating Activities", "Net Change in Cash"]),
+        "income_statements": ("income", ["Revenue", "Gross Profit", "Net Income"]),
+    }
+    for folder, (prefix, columns) in statements.items():
+        path = os.path.join(
+            data_dir, "fundamental_data", "simfin_data_all", folder, "companies", "us"
+        )
+        os.makedirs(path, exist_ok=True)
+        for freq, months in (("annual", 12), ("quarterly", 3)):
+            rows = []
+            for ticker in tickers:
+                for report in pd.date_range("2016-01-01", PRICE_END, freq=f"{months}MS"):
+                    row = {
+                        "Ticker": ticker,
+                        "SimFinId": 1,
+                        "Currency": "USD",
+                        "Report Date": report.strftime("%Y-%m-%d"),
+                        "Publish Date": (report + timedelta(days=30)).strftime("%Y-%m-%d"),
+                    }
+                    row.update({c: rng.randint(10**8, 10**11) for c in columns})
+                    rows.append(row)
+            pd.DataFrame(rows).to_csv(
+                os.path.join(path, f"us-{prefix}-{freq}.csv"), sep=";", index=False
+            )
+
+
+def write_reddit_data(data_dir: str, tickers, start: str, end: str):
+    for category in ("global_news", "company_news"):
+        path = os.path.join(data_dir, "reddit_data", category)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "synthetic.jsonl"), "w") as f:
+            for day in _days(start, end):
+                created = int((day + timedelta(hours=12)).timestamp())
+                subjects = tickers if category == "company_news" else ["markets"]
+                for subject in subjects:
+                    for i in range(3):
+                        f.write(
+                            json.dumps(
+                                {
+                                    "created_utc": created,
+                                    "title": f"{subject} post {i} on {day:%Y-%m-%d}",
+                                    "selftext": f"Synthetic discussion about {subject}.",
+                                    "url": f"https://example.invalid/{subject}/{i}",
+                                    "ups": 100 - i,
+                                }
+                            )
+                            + "\n"
+                        )
+
+
+def write_fixtures(data_dir: str, tickers=("NVDA",), start="2024-03-01", end="2024-06-30", seed=0):
+    """Write synthetic data for tickers covering trade dates in [start, end]."""
+    rng = random.Random(seed)
+    for ticker in tickers:
+        write_price_data(data_dir, ticker, rng)
+        write_finnhub_data(data_dir, ticker, start, end, rng)
+    write_simfin_data(data_dir, tickers, rng)
+    write_reddit_data(data_dir, tickers, start, end)
+    return data_dir
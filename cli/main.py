@@ -22,6 +22,7 @@ from rich.rule import Rule
 
 from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.dataflows.config import set_config
 from cli.models import AnalystType
 from cli.utils import *
 
@@ -744,6 +745,10 @@ def run_analysis():
     config["backend_url"] = selections["backend_url"]
     config["llm_provider"] = selections["llm_provider"].lower()
 
+    # The CLI streams graph.graph directly rather than through propagate(),
+    # so make this the process-wide config the dataflows fall back to
+    set_config(config)
+
     # Initialize the graph
     graph = TradingAgentsGraph(
         [analyst.value for analyst in selections["analysts"]], config=config, debug=True
@@ -839,10 +844,18 @@ def run_analysis():
         init_agent_state = graph.propagator.create_initial_state(
             selections["ticker"], selections["analysis_date"]
         )
-        args = graph.propagator.get_graph_args()
+        callbacks = []
+        run_metrics = None
+        if graph.metrics is not None:
+            run_metrics, metrics_handler = graph.metrics.start_run(
+                selections["ticker"], selections["analysis_date"]
+            )
+            callbacks.append(metrics_handler)
+        args = graph.propagator.get_graph_args(callbacks)
 
         # Stream the analysis
         trace = []
+        start_time = time.perf_counter()
         for chunk in graph.graph.stream(init_agent_state, **args):
             if len(chunk["messages"]) > 0:
                 # Get the last message from the chunk
@@ -1077,6 +1090,10 @@ def run_analysis():
         final_state = trace[-1]
         decision = graph.process_signal(final_state["final_trade_decision"])
 
+        if run_metrics is not None:
+            run_metrics.wall_time = time.perf_counter() - start_time
+            graph.metrics.export_json(results_dir / "metrics.json", run_metrics)
+
         # Update all agent statuses to completed
         for agent in message_buffer.agent_status:
             message_buffer.update_agent_status(agent, "completed")
@@ -1,4 +1,4 @@
-import os, json, base64, sqlite3
+import os, json, base64
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.security import HTTPBearer
 import httpx, jwt
@@ -7,6 +7,8 @@ from typing import List
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 
+from services.common.audit import AuditWriter
+
 app = FastAPI(title="Broker Agent", version="0.1")
 
 DESCOPE_ISSUER     = os.getenv("DESCOPE_ISSUER")
@@ -19,6 +21,13 @@ BROKER_PRIV        = os.getenv("BROKER_SIGNING_PRIV","./secrets/broker_priv.pem"
 
 security = HTTPBearer()
 
+# batched single-writer audit log, shared table with the other agents
+AUDIT = AuditWriter(DB_PATH)
+
+@app.on_event("shutdown")
+def close_audit():
+    AUDIT.close()
+
 # load signing key
 with open(BROKER_PRIV, "rb") as f:
     private_key = serialization.load_pem_private_key(f.read(), password=None)
@@ -27,9 +36,10 @@ assert isinstance(private_key, Ed25519PrivateKey)
 @app.get("/health")
 def health():
     return {
-        "status":"ok",
+        "status":"ok" if AUDIT.healthy() else "degraded",
         "allowed_scopes": ALLOWED_SCOPES,
-        "require_consent_for": REQUIRE_CONSENT_FOR
+        "require_consent_for": REQUIRE_CONSENT_FOR,
+        "audit": AUDIT.status()
     }
 
 def _jwks_keys():
@@ -71,15 +81,7 @@ def sign_receipt(d: dict) -> str:
     return base64.b64encode(private_key.sign(msg)).decode()
 
 def log_audit(agent: str, action: str, scope: str, payload: str):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""CREATE TABLE IF NOT EXISTS audit_logs(
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      agent TEXT, action TEXT, scope TEXT, signed_result TEXT,
-      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-    cur.execute("INSERT INTO audit_logs(agent,action,scope,signed_result,created_at) VALUES(?,?,?,?,?)",
-                (agent, action, scope, payload, datetime.utcnow().isoformat()))
-    conn.commit(); conn.close()
+    AUDIT.log(agent, action, scope, payload)
 
 @app.post("/orders")
 async def place_order(req: Request, cred=Depends(security)):
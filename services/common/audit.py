@@ -0,0 +1,318 @@
+import os, glob, json, time, uuid, queue, atexit, sqlite3, logging, threading
+from datetime import datetime
+from typing import Optional
+
+from services.common.db import connect, db_path
+
+try:
+    import fcntl
+except ImportError:  # no cross-process locking of the spill files
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+AUDIT_FLUSH_MS      = int(os.getenv("AUDIT_FLUSH_MS", "50"))
+AUDIT_MAX_BATCH     = int(os.getenv("AUDIT_MAX_BATCH", "200"))
+AUDIT_MAX_QUEUE     = int(os.getenv("AUDIT_MAX_QUEUE", "10000"))
+AUDIT_MAX_ATTEMPTS  = int(os.getenv("AUDIT_MAX_ATTEMPTS", "10"))
+AUDIT_MAX_BACKOFF_S = float(os.getenv("AUDIT_MAX_BACKOFF_S", "5"))
+AUDIT_SPILL_PATH    = os.getenv("AUDIT_SPILL_PATH")
+
+SCHEMA = """CREATE TABLE IF NOT EXISTS audit_logs(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent TEXT, action TEXT, scope TEXT, signed_result TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)"""
+
+INSERT = "INSERT INTO audit_logs(agent,action,scope,signed_result,created_at) VALUES(?,?,?,?,?)"
+
+_CLOSE = object()
+
+def _flock(fd: int, block: bool = True) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | (0 if block else fcntl.LOCK_NB))
+        return True
+    except BlockingIOError:
+        return False
+
+def _is_current(fd: int, path: str) -> bool:
+    """Whether fd is still the file at path, i.e. not claimed or removed meanwhile."""
+    try:
+        return os.stat(path).st_ino == os.fstat(fd).st_ino
+    except FileNotFoundError:
+        return False
+
+class AuditWriter:
+    """
+    Single writer for the audit_logs table.
+    log() only enqueues the row and never blocks, so callers on the trade path
+    (including async handlers) never wait for SQLite. A background thread
+    drains the queue and inserts rows in batches, one transaction per batch:
+      - a batch is written once it has max_batch rows or flush_ms after its
+        first row arrived, whichever comes first (bounded flush latency)
+      - a failed batch (e.g. "database is locked") is retried with exponential
+        backoff; after max_attempts it is appended to a JSONL spill file
+      - rows that find the queue full go to the same spill file
+      - spilled rows are inserted again once writes succeed, and at startup;
+        a crash during that replay can insert them twice, never zero times
+    Several processes may share the spill file: it is appended to under an
+    exclusive file lock, and replayed by renaming it to a .replay-<id> file
+    first, which stays locked until its rows are in (so a file is replayed by
+    one process at a time, and files left by a crashed process are picked up
+    by the next replay). Spill lines that don't parse are moved to <spill>.bad.
+    Rows are only lost if the spill file cannot be written either; status()
+    reports that, and every other failure, for the health endpoints.
+    """
+
+    def __init__(self, path: Optional[str] = None, flush_ms: int = AUDIT_FLUSH_MS,
+                 max_batch: int = AUDIT_MAX_BATCH, max_queue: int = AUDIT_MAX_QUEUE,
+                 max_attempts: int = AUDIT_MAX_ATTEMPTS, max_backoff_s: float = AUDIT_MAX_BACKOFF_S,
+                 spill_path: Optional[str] = AUDIT_SPILL_PATH, busy_timeout_ms: int = 5000):
+        self.path = path or db_path()
+        self.spill_path = spill_path or f"{self.path}.audit-spill.jsonl"
+        self.flush_interval = flush_ms / 1000
+        self.max_batch = max_batch
+        self.max_attempts = max(1, max_attempts)
+        self.max_backoff_s = max_backoff_s
+        self.written = 0
+        self.retries = 0
+        self.spilled = 0
+        self.dropped = 0
+        self.quarantined = 0
+        self.last_error: Optional[str] = None
+        self.failing_since: Optional[str] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._spill_pending = os.path.exists(self.spill_path) or bool(self._claimed_spills())
+        self._closed = False
+        self._closing = threading.Event()
+        # the writer thread's connection; the table exists once __init__ returns
+        self._conn = connect(self.path, busy_timeout_ms)
+        with self._conn:
+            self._conn.execute(SCHEMA)
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, agent: str, action: str, scope: str, payload: str):
+        """Queue one audit row without blocking; spills it when the queue is full."""
+        row = (agent, action, scope, payload, datetime.utcnow().isoformat())
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("audit writer is closed")
+            try:
+                self._queue.put_nowait(row)
+                return
+            except queue.Full:
+                pass
+        self._spill([row], "queue full")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every row queued so far has been written or spilled."""
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not done.wait(0.5 if deadline is None else min(0.5, max(deadline - time.monotonic(), 0))):
+            if not self._thread.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                return False
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # stop backing off; whatever still fails is spilled
+        self._closing.set()
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def healthy(self) -> bool:
+        return (self.failing_since is None and self.dropped == 0 and self.quarantined == 0
+                and (self._closed or self._thread.is_alive()))
+
+    def status(self) -> dict:
+        return {
+            "healthy": self.healthy(),
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "retries": self.retries,
+            "spilled": self.spilled,
+            "dropped": self.dropped,
+            "quarantined": self.quarantined,
+            "writer_alive": self._thread.is_alive(),
+            "failing_since": self.failing_since,
+            "last_error": self.last_error,
+            "spill_path": self.spill_path,
+        }
+
+    def _spill(self, rows, reason: str):
+        if not rows:
+            return
+        data = "".join(json.dumps(row) + "\n" for row in rows).encode()
+        with self._spill_lock:
+            try:
+                self._append_spill(data)
+            except OSError:
+                self.dropped += len(rows)
+                logger.exception("audit writer: %s and spilling failed, lost %d rows", reason, len(rows))
+                return
+            self._spill_pending = True
+            self.spilled += len(rows)
+        logger.error("audit writer: %s, spilled %d rows to %s", reason, len(rows), self.spill_path)
+
+    def _append_spill(self, data: bytes):
+        while True:
+            fd = os.open(self.spill_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                _flock(fd)
+                # another process may have claimed the file while we waited
+                if not _is_current(fd, self.spill_path):
+                    continue
+                # don't glue rows onto a line torn by a crash mid-spill
+                if os.fstat(fd).st_size:
+                    os.lseek(fd, -1, os.SEEK_END)
+                    if os.read(fd, 1) != b"\n":
+                        data = b"\n" + data
+                while data:
+                    data = data[os.write(fd, data):]
+                return
+            finally:
+                os.close(fd)  # releases the lock
+
+    def _fail(self, e: Exception):
+        self.last_error = f"{type(e).__name__}: {e}"
+        self.failing_since = self.failing_since or datetime.utcnow().isoformat()
+
+    def _write(self, batch) -> bool:
+        """Insert batch, retrying with backoff; spills it if every attempt fails."""
+        delay = 0.1
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with self._conn:
+                    self._conn.executemany(INSERT, batch)
+            except sqlite3.Error as e:
+                self._fail(e)
+                if attempt == self.max_attempts or self._closing.is_set():
+                    break
+                self.retries += 1
+                logger.warning("audit writer: insert of %d rows failed (%s), retrying in %.1fs",
+                               len(batch), self.last_error, delay)
+                self._closing.wait(delay)
+                delay = min(delay * 2, self.max_backoff_s)
+            else:
+                self.written += len(batch)
+                self.failing_since = None
+                return True
+        self._spill(batch, f"insert failed after {attempt} attempts ({self.last_error})")
+        return False
+
+    def _claimed_spills(self):
+        # ".replay" is the name older versions used
+        return sorted(glob.glob(glob.escape(self.spill_path) + ".replay*"))
+
+    def _claim_spill(self):
+        """Rename the spill file to a .replay-<id> file, so new spills start a fresh one."""
+        try:
+            fd = os.open(self.spill_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            _flock(fd)
+            if _is_current(fd, self.spill_path):
+                os.rename(self.spill_path, f"{self.spill_path}.replay-{uuid.uuid4().hex}")
+        finally:
+            os.close(fd)
+
+    def _replay_spill(self):
+        """Insert spilled rows again, from this or any other process sharing the spill file."""
+        with self._spill_lock:
+            self._spill_pending = False
+            self._claim_spill()
+        for path in self._claimed_spills():
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                # skip files another process is replaying or has just replayed
+                if _flock(fd, block=False) and _is_current(fd, path):
+                    self._replay_file(path)
+            finally:
+                os.close(fd)
+
+    def _replay_file(self, path: str):
+        rows, bad = [], []
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, list) or len(row) != 5:
+                        raise ValueError("not an audit row")
+                    rows.append(tuple(row))
+                except ValueError:
+                    bad.append(line if line.endswith(b"\n") else line + b"\n")
+        if bad:
+            # e.g. a line torn by a crash; kept for inspection, never replayed
+            with open(f"{self.spill_path}.bad", "ab") as f:
+                f.writelines(bad)
+            self.quarantined += len(bad)
+            logger.error("audit writer: moved %d unreadable spill lines to %s.bad", len(bad), self.spill_path)
+        # rows that fail again are spilled again, so the replayed file can go
+        for start in range(0, len(rows), self.max_batch):
+            if not self._write(rows[start:start + self.max_batch]):
+                self._spill(rows[start + self.max_batch:], "database still failing")
+                break
+        os.remove(path)
+        logger.info("audit writer: replayed %d spilled rows from %s", len(rows), path)
+
+    def _try_replay(self):
+        try:
+            self._replay_spill()
+        except Exception as e:
+            # the claimed files stay on disk; retried after the next write
+            self._fail(e)
+            self._spill_pending = True
+            logger.exception("audit writer: replaying spilled rows failed")
+
+    def _run(self):
+        conn = self._conn
+        if self._spill_pending:
+            self._try_replay()
+        closing = False
+        while not closing:
+            batch, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _CLOSE:
+                    closing = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            try:
+                written = bool(batch) and self._write(batch)
+            except Exception as e:
+                # anything but a database error; keep the rows and the thread
+                self._fail(e)
+                logger.exception("audit writer: insert of %d rows raised", len(batch))
+                self._spill(batch, f"insert raised {self.last_error}")
+                written = False
+            if written and self._spill_pending and not self._closing.is_set():
+                self._try_replay()
+            for done in waiters:
+                done.set()
+        conn.close()
@@ -0,0 +1,82 @@
+import os, sqlite3, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+DEFAULT_DATABASE_URL = "sqlite:///./data/trusted_trading.sqlite3"
+
+def db_path() -> str:
+    return os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL).replace("sqlite:///", "")
+
+def connect(path: str, busy_timeout_ms: int = 5000) -> sqlite3.Connection:
+    """
+    Open a connection tuned for several services sharing one SQLite file:
+      - WAL journal, so readers don't block the writer and vice versa
+      - busy_timeout, so a locked database is waited on instead of failing
+      - synchronous=NORMAL, which is durable enough under WAL and much faster
+    """
+    conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class Database:
+    """
+    Long-lived SQLite connections for an async service.
+    Work runs on a fixed pool of worker threads, each holding its own
+    connection for the life of the process, so request handlers never open
+    a connection or block the event loop on disk I/O.
+    Each run() is one transaction: committed on success, rolled back on error.
+    """
+
+    def __init__(self, path: Optional[str] = None, pool_size: int = 4, busy_timeout_ms: int = 5000):
+        self.path = path or db_path()
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="sqlite")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.path, self.busy_timeout_ms)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _run(self, fn: Callable[..., Any], args: Sequence[Any]) -> Any:
+        conn = self._connection()
+        try:
+            result = fn(conn, *args)
+            conn.commit()
+            return result
+        except BaseException:
+            conn.rollback()
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(conn, *args) on a pooled connection without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, fn, args)
+
+    def run_sync(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Same as run() for synchronous callers, e.g. startup code."""
+        return self._executor.submit(self._run, fn, args).result()
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        return await self.run(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
@@ -1,9 +1,12 @@
-import os, json, sqlite3, uuid, base64, time, asyncio
+import os, json, uuid, base64, time, asyncio
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Body
 from starlette.responses import StreamingResponse
 import httpx
 
+from services.common.audit import AuditWriter
+from services.common.db import Database
+
 # --- Load .env automatically ---
 try:
     from dotenv import load_dotenv
@@ -23,12 +26,17 @@ ORCH_LIVE_CLIENT_SECRET = os.getenv("ORCH_LIVE_CLIENT_SECRET")
 RISK_URL   = os.getenv("RISK_URL",   "http://localhost:7002")
 BROKER_URL = os.getenv("BROKER_URL", "http://localhost:7003")
 DB_PATH    = os.getenv("DATABASE_URL", "sqlite:///./data/trusted_trading.sqlite3").replace("sqlite:///", "")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+# risk and broker already audit their signed verdicts/receipts in the shared table;
+# set this only if they write to a different database
+AUDIT_RELOG_DOWNSTREAM = os.getenv("AUDIT_RELOG_DOWNSTREAM", "false").lower() in ("1", "true", "yes")
 
-def db():
-    return sqlite3.connect(DB_PATH)
+# long-lived WAL connections; queries run on the pool's threads, not the event loop
+DB = Database(DB_PATH, pool_size=DB_POOL_SIZE)
+AUDIT = AuditWriter(DB_PATH)
 
-def init_db():
-    conn = db(); cur = conn.cursor()
+def _init_schema(conn):
+    cur = conn.cursor()
     cur.execute("""CREATE TABLE IF NOT EXISTS consents(
         id TEXT PRIMARY KEY,
         user_id TEXT,
@@ -40,9 +48,16 @@ def init_db():
         agent TEXT, action TEXT, scope TEXT, signed_result TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )""")
-    conn.commit(); conn.close()
+
+def init_db():
+    DB.run_sync(_init_schema)
 init_db()
 
+@app.on_event("shutdown")
+def close_db():
+    AUDIT.close()
+    DB.close()
+
 # ---------- TOKEN MINTING WITH CACHE + RETRY ----------
 
 _TOKEN_CACHE: dict[str, tuple[float, str]] = {}
@@ -94,23 +109,24 @@ async def _mint(scope: str) -> str:
             last_err = f"ConnectTimeout: {e}"
         except Exception as e:
             last_err = f"{type(e).__name__}: {e}"
-        time.sleep(0.5 * (2 ** attempt))  # exponential backoff
+        await asyncio.sleep(0.5 * (2 ** attempt))  # exponential backoff, without blocking the loop
 
     raise HTTPException(502, detail=f"Token mint failed after retries: {last_err}")
 
 # ---------- LOGGING ----------
 
 def _log(agent: str, action: str, scope: str, payload: dict):
-    conn = db(); cur = conn.cursor()
-    cur.execute("INSERT INTO audit_logs(agent,action,scope,signed_result,created_at) VALUES(?,?,?,?,?)",
-                (agent, action, scope, json.dumps(payload), datetime.utcnow().isoformat()))
-    conn.commit(); conn.close()
+    AUDIT.log(agent, action, scope, json.dumps(payload))
+
+def _log_downstream(agent: str, action: str, scope: str, payload: dict):
+    if AUDIT_RELOG_DOWNSTREAM:
+        _log(agent, action, scope, payload)
 
 # ---------- HEALTH / DEBUG ----------
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {"status": "ok" if AUDIT.healthy() else "degraded", "audit": AUDIT.status()}
 
 @app.get("/debug/env")
 def debug_env():
@@ -132,30 +148,24 @@ async def debug_mint(scope: str = "place:live"):
 # ---------- CONSENT FLOW ----------
 
 @app.post("/consent/grant")
-def consent_grant(user_id: str = Body(...), scope: str = Body("place:live")):
+async def consent_grant(user_id: str = Body(...), scope: str = Body("place:live")):
     if scope != "place:live":
         raise HTTPException(400, detail="only place:live consent is supported in this demo")
     cid = str(uuid.uuid4())
-    conn = db(); cur = conn.cursor()
-    cur.execute("INSERT INTO consents(id,user_id,scope,granted_at) VALUES(?,?,?,?)",
-                (cid, user_id, scope, datetime.utcnow().isoformat()))
-    conn.commit(); conn.close()
+    await DB.execute("INSERT INTO consents(id,user_id,scope,granted_at) VALUES(?,?,?,?)",
+                     (cid, user_id, scope, datetime.utcnow().isoformat()))
     return {"consent_id": cid, "user_id": user_id, "scope": scope}
 
 @app.get("/consent/{consent_id}")
-def consent_get(consent_id: str):
-    conn = db(); cur = conn.cursor()
-    cur.execute("SELECT id,user_id,scope,granted_at FROM consents WHERE id = ?", (consent_id,))
-    row = cur.fetchone(); conn.close()
+async def consent_get(consent_id: str):
+    row = await DB.fetchone("SELECT id,user_id,scope,granted_at FROM consents WHERE id = ?", (consent_id,))
     if not row:
         raise HTTPException(404, detail="consent not found")
     return {"consent_id": row[0], "user_id": row[1], "scope": row[2], "granted_at": row[3]}
 
 @app.get("/consent")
-def consent_list():
-    conn = db(); cur = conn.cursor()
-    cur.execute("SELECT id,user_id,scope,granted_at FROM consents ORDER BY granted_at DESC LIMIT 50")
-    rows = cur.fetchall(); conn.close()
+async def consent_list():
+    rows = await DB.fetchall("SELECT id,user_id,scope,granted_at FROM consents ORDER BY granted_at DESC LIMIT 50")
     return [{"consent_id": r[0], "user_id": r[1], "scope": r[2], "granted_at": r[3]} for r in rows]
 
 # ---------- SIMULATED TRADE ----------
@@ -170,7 +180,7 @@ async def trade_sim(order: dict):
     if rr.status_code != 200:
         raise HTTPException(rr.status_code, detail=rr.text)
     verdict = rr.json()
-    _log("risk-agent","evaluate","risk.evaluate",verdict)
+    _log_downstream("risk-agent","evaluate","risk.evaluate",verdict)
     if not verdict.get("ok"):
         return {"step":"risk","approved":False,"verdict":verdict}
 
@@ -182,15 +192,13 @@ async def trade_sim(order: dict):
     if br.status_code != 200:
         raise HTTPException(br.status_code, detail=br.text)
     receipt = br.json()
-    _log("broker-agent","order","place:simulate",receipt)
+    _log_downstream("broker-agent","order","place:simulate",receipt)
     return {"step":"broker","approved":True,"verdict":verdict,"receipt":receipt}
 
 # ---------- LIVE TRADE (REQUIRES CONSENT) ----------
 
-def _require_consent(consent_id: str, user_id: str, scope: str = "place:live"):
-    conn = db(); cur = conn.cursor()
-    cur.execute("SELECT id,user_id,scope FROM consents WHERE id = ?", (consent_id,))
-    row = cur.fetchone(); conn.close()
+async def _require_consent(consent_id: str, user_id: str, scope: str = "place:live"):
+    row = await DB.fetchone("SELECT id,user_id,scope FROM consents WHERE id = ?", (consent_id,))
     if not row:
         raise HTTPException(400, detail="invalid consent_id")
     if row[1] != user_id:
@@ -204,7 +212,7 @@ async def trade_live(order: dict):
     user_id, consent_id = order.get("user_id"), order.get("consent_id")
     if not user_id or not consent_id:
         raise HTTPException(400, detail="user_id and consent_id are required")
-    _require_consent(consent_id, user_id, "place:live")
+    await _require_consent(consent_id, user_id, "place:live")
 
     risk_token = await _mint("risk.evaluate")
     async with httpx.AsyncClient(timeout=10) as client:
@@ -214,7 +222,7 @@ async def trade_live(order: dict):
     if rr.status_code != 200:
         raise HTTPException(rr.status_code, detail=rr.text)
     verdict = rr.json()
-    _log("risk-agent","evaluate","risk.evaluate",verdict)
+    _log_downstream("risk-agent","evaluate","risk.evaluate",verdict)
     if not verdict.get("ok"):
         return {"step":"risk","approved":False,"verdict":verdict}
 
@@ -226,21 +234,19 @@ async def trade_live(order: dict):
     if br.status_code != 200:
         raise HTTPException(br.status_code, detail=br.text)
     receipt = br.json()
-    _log("broker-agent","order","place:live",receipt)
+    _log_downstream("broker-agent","order","place:live",receipt)
     return {"step":"broker","approved":True,"verdict":verdict,"receipt":receipt}
 
 # ---------- AUDIT LOGS ----------
 @app.get("/logs/recent")
-def logs_recent(limit: int = 10):
+async def logs_recent(limit: int = 10):
     if limit <= 0 or limit > 200:
         raise HTTPException(400, detail="limit must be between 1 and 200")
-    conn = db(); cur = conn.cursor()
-    cur.execute(
+    rows = await DB.fetchall(
         "SELECT id,agent,action,scope,signed_result,created_at "
         "FROM audit_logs ORDER BY created_at DESC LIMIT ?",
         (limit,),
     )
-    rows = cur.fetchall(); conn.close()
     return [
         {
             "id": r[0], "agent": r[1], "action": r[2], "scope": r[3],
@@ -252,19 +258,14 @@ def logs_recent(limit: int = 10):
 @app.get("/logs/stream")
 async def logs_stream(poll_interval: float = 1.0):
     async def event_generator():
-        conn = db(); cur = conn.cursor()
-        cur.execute("SELECT IFNULL(MAX(id), 0) FROM audit_logs")
-        last_id = cur.fetchone()[0] or 0
-        conn.close()
+        last_id = (await DB.fetchone("SELECT IFNULL(MAX(id), 0) FROM audit_logs"))[0] or 0
         while True:
             await asyncio.sleep(poll_interval)
-            conn = db(); cur = conn.cursor()
-            cur.execute(
+            rows = await DB.fetchall(
                 "SELECT id,agent,action,scope,signed_result,created_at "
                 "FROM audit_logs WHERE id > ? ORDER BY id ASC",
                 (last_id,),
             )
-            rows = cur.fetchall(); conn.close()
             for r in rows:
                 last_id = r[0]
                 payload = {
@@ -1,4 +1,4 @@
-import os, json, base64, sqlite3
+import os, json, base64
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.security import HTTPBearer
 import jwt, httpx
@@ -6,6 +6,8 @@ from datetime import datetime
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 
+from services.common.audit import AuditWriter
+
 app = FastAPI(title="Risk Agent", version="0.3")
 
 DESCOPE_ISSUER   = os.getenv("DESCOPE_ISSUER")
@@ -16,6 +18,13 @@ DB_PATH          = os.getenv("DATABASE_URL", "sqlite:///./data/trusted_trading.s
 
 security = HTTPBearer()
 
+# batched single-writer audit log, shared table with the other agents
+AUDIT = AuditWriter(DB_PATH)
+
+@app.on_event("shutdown")
+def close_audit():
+    AUDIT.close()
+
 # Load Ed25519 signing key from PEM
 with open(RISK_SIGNING_PRIV, "rb") as f:
     private_key = serialization.load_pem_private_key(f.read(), password=None)
@@ -23,7 +32,8 @@ assert isinstance(private_key, Ed25519PrivateKey)
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "required_scope": REQUIRED_SCOPE}
+    return {"status": "ok" if AUDIT.healthy() else "degraded", "required_scope": REQUIRED_SCOPE,
+            "audit": AUDIT.status()}
 
 def _fetch_jwks():
     try:
@@ -71,15 +81,7 @@ def sign_verdict(v: dict) -> str:
     return base64.b64encode(private_key.sign(msg)).decode()
 
 def log_audit(agent: str, action: str, scope: str, signed_result: str):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""CREATE TABLE IF NOT EXISTS audit_logs(
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        agent TEXT, action TEXT, scope TEXT, signed_result TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-    cur.execute("INSERT INTO audit_logs(agent,action,scope,signed_result,created_at) VALUES(?,?,?,?,?)",
-                (agent, action, scope, signed_result, datetime.utcnow().isoformat()))
-    conn.commit(); conn.close()
+    AUDIT.log(agent, action, scope, signed_result)
 
 @app.post("/risk/evaluate")
 async def evaluate(request: Request, credentials=Depends(security)):
@@ -1,6 +1,7 @@
-from .utils.agent_utils import Toolkit, create_msg_delete
+from .utils.agent_utils import Toolkit, create_msg_delete, create_memory_prefetch
 from .utils.agent_states import AgentState, InvestDebateState, RiskDebateState
-from .utils.memory import FinancialSituationMemory
+from .utils.memory import FinancialSituationMemory, MemoryHub
+from .utils.report_digest import create_report_digest
 
 from .analysts.fundamentals_analyst import create_fundamentals_analyst
 from .analysts.market_analyst import create_market_analyst
@@ -17,13 +18,17 @@ from .risk_mgmt.neutral_debator import create_neutral_debator
 from .managers.research_manager import create_research_manager
 from .managers.risk_manager import create_risk_manager
 
+from .trader.research_trader import create_research_trader
 from .trader.trader import create_trader
 
 __all__ = [
     "FinancialSituationMemory",
+    "MemoryHub",
     "Toolkit",
     "AgentState",
     "create_msg_delete",
+    "create_memory_prefetch",
+    "create_report_digest",
     "InvestDebateState",
     "RiskDebateState",
     "create_bear_researcher",
@@ -34,6 +39,7 @@ __all__ = [
     "create_neutral_debator",
     "create_news_analyst",
     "create_risky_debator",
+    "create_research_trader",
     "create_risk_manager",
     "create_safe_debator",
     "create_social_media_analyst",
@@ -1,55 +1,66 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from tradingagents.agents.utils.agent_utils import (
+    create_analyst_chains,
+    get_incremental_instructions,
+    invoke_analyst,
+)
 import time
 import json
 
 
-def create_fundamentals_analyst(llm, toolkit):
-    def fundamentals_analyst_node(state):
-        current_date = state["trade_date"]
-        ticker = state["company_of_interest"]
-        company_name = state["company_of_interest"]
-
-        if toolkit.config["online_tools"]:
-            tools = [toolkit.get_fundamentals_openai]
-        else:
-            tools = [
-                toolkit.get_finnhub_company_insider_sentiment,
-                toolkit.get_finnhub_company_insider_transactions,
-                toolkit.get_simfin_balance_sheet,
-                toolkit.get_simfin_cashflow,
-                toolkit.get_simfin_income_stmt,
-            ]
+def create_fundamentals_analyst(llm, toolkit, tool_llm=None, compact_tool_results=None):
+    online_tools = [toolkit.get_fundamentals_openai]
+    offline_tools = [
+        toolkit.get_finnhub_company_insider_sentiment,
+        toolkit.get_finnhub_company_insider_transactions,
+        toolkit.get_simfin_balance_sheet,
+        toolkit.get_simfin_cashflow,
+        toolkit.get_simfin_income_stmt,
+    ]
 
-        system_message = (
-            "You are a researcher tasked with analyzing fundamental information over the past week about a company. Please write a comprehensive report of the company's fundamental information such as financial documents, company profile, basic company financials, company financial history, insider sentiment and insider transactions to gain a full view of the company's fundamental information to inform traders. Make sure to include as much detail as possible. Do not simply state the trends are mixed, provide detailed and finegrained analysis and insights that may help traders make decisions."
-            + " Make sure to append a Markdown table at the end of the report to organize key points in the report, organized and easy to read.",
-        )
+    system_message = (
+        "You are a researcher tasked with analyzing fundamental information over the past week about a company. Please write a comprehensive report of the company's fundamental information such as financial documents, company profile, basic company financials, company financial history, insider sentiment and insider transactions to gain a full view of the company's fundamental information to inform traders. Make sure to include as much detail as possible. Do not simply state the trends are mixed, provide detailed and finegrained analysis and insights that may help traders make decisions."
+        + " Make sure to append a Markdown table at the end of the report to organize key points in the report, organized and easy to read."
+    )
 
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    "You are a helpful AI assistant, collaborating with other assistants."
-                    " Use the provided tools to progress towards answering the question."
-                    " If you are unable to fully answer, that's OK; another assistant with different tools"
-                    " will help where you left off. Execute what you can to make progress."
-                    " If you or any other assistant has the FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL** or deliverable,"
-                    " prefix your response with FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL** so the team knows to stop."
-                    " You have access to the following tools: {tool_names}.\n{system_message}"
-                    "For your reference, the current date is {current_date}. The company we want to look at is {ticker}",
-                ),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        )
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                "You are a helpful AI assistant, collaborating with other assistants."
+                " Use the provided tools to progress towards answering the question."
+                " If you are unable to fully answer, that's OK; another assistant with different tools"
+                " will help where you left off. Execute what you can to make progress."
+                " If you or any other assistant has the FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL** or deliverable,"
+                " prefix your response with FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL** so the team knows to stop."
+                " You have access to the following tools: {tool_names}.\n{system_message}"
+                "For your reference, the current date is {current_date}. The company we want to look at is {ticker}{incremental_instructions}",
+            ),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    ).partial(system_message=system_message)
 
-        prompt = prompt.partial(system_message=system_message)
-        prompt = prompt.partial(tool_names=", ".join([tool.name for tool in tools]))
-        prompt = prompt.partial(current_date=current_date)
-        prompt = prompt.partial(ticker=ticker)
+    # Bind both tool sets once; online_tools is read per run
+    chains = {
+        True: create_analyst_chains(
+            prompt, llm, online_tools, tool_llm, compact_tool_results
+        ),
+        False: create_analyst_chains(
+            prompt, llm, offline_tools, tool_llm, compact_tool_results
+        ),
+    }
 
-        chain = prompt | llm.bind_tools(tools)
-
-        result = chain.invoke(state["messages"])
+    def fundamentals_analyst_node(state):
+        result = invoke_analyst(
+            chains[bool(toolkit.config["online_tools"])],
+            {
+                "messages": state["messages"],
+                "current_date": state["trade_date"],
+                "ticker": state["company_of_interest"],
+                "incremental_instructions": get_incremental_instructions(state, "fundamentals"),
+            },
+            "fundamentals",
+        )
 
         report = ""
 
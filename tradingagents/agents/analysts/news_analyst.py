@@ -1,51 +1,64 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from tradingagents.agents.utils.agent_utils import (
+    create_analyst_chains,
+    get_incremental_instructions,
+    invoke_analyst,
+)
 import time
 import json
 
 
-def create_news_analyst(llm, toolkit):
-    def news_analyst_node(state):
-        current_date = state["trade_date"]
-        ticker = state["company_of_interest"]
-
-        if toolkit.config["online_tools"]:
-            tools = [toolkit.get_global_news_openai, toolkit.get_google_news]
-        else:
-            tools = [
-                toolkit.get_finnhub_news,
-                toolkit.get_reddit_news,
-                toolkit.get_google_news,
-            ]
-
-        system_message = (
-            "You are a news researcher tasked with analyzing recent news and trends over the past week. Please write a comprehensive report of the current state of the world that is relevant for trading and macroeconomics. Look at news from EODHD, and finnhub to be comprehensive. Do not simply state the trends are mixed, provide detailed and finegrained analysis and insights that may help traders make decisions."
-            + """ Make sure to append a Makrdown table at the end of the report to organize key points in the report, organized and easy to read."""
-        )
+def create_news_analyst(llm, toolkit, tool_llm=None, compact_tool_results=None):
+    online_tools = [toolkit.get_global_news_openai, toolkit.get_google_news]
+    offline_tools = [
+        toolkit.get_finnhub_news,
+        toolkit.get_reddit_news,
+        toolkit.get_google_news,
+    ]
 
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    "You are a helpful AI assistant, collaborating with other assistants."
-                    " Use the provided tools to progress towards answering the question."
-                    " If you are unable to fully answer, that's OK; another assistant with different tools"
-                    " will help where you left off. Execute what you can to make progress."
-                    " If you or any other assistant has the FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL** or deliverable,"
-                    " prefix your response with FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL** so the team knows to stop."
-                    " You have access to the following tools: {tool_names}.\n{system_message}"
-                    "For your reference, the current date is {current_date}. We are looking at the company {ticker}",
-                ),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        )
+    system_message = (
+        "You are a news researcher tasked with analyzing recent news and trends over the past week. Please write a comprehensive report of the current state of the world that is relevant for trading and macroeconomics. Look at news from EODHD, and finnhub to be comprehensive. Do not simply state the trends are mixed, provide detailed and finegrained analysis and insights that may help traders make decisions."
+        + """ Make sure to append a Makrdown table at the end of the report to organize key points in the report, organized and easy to read."""
+    )
 
-        prompt = prompt.partial(system_message=system_message)
-        prompt = prompt.partial(tool_names=", ".join([tool.name for tool in tools]))
-        prompt = prompt.partial(current_date=current_date)
-        prompt = prompt.partial(ticker=ticker)
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                "You are a helpful AI assistant, collaborating with other assistants."
+                " Use the provided tools to progress towards answering the question."
+                " If you are unable to fully answer, that's OK; another assistant with different tools"
+                " will help where you left off. Execute what you can to make progress."
+                " If you or any other assistant has the FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL** or deliverable,"
+                " prefix your response with FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL** so the team knows to stop."
+                " You have access to the following tools: {tool_names}.\n{system_message}"
+                "For your reference, the current date is {current_date}. We are looking at the company {ticker}{incremental_instructions}",
+            ),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    ).partial(system_message=system_message)
 
-        chain = prompt | llm.bind_tools(tools)
-        result = chain.invoke(state["messages"])
+    # Bind both tool sets once; online_tools is read per run
+    chains = {
+        True: create_analyst_chains(
+            prompt, llm, online_tools, tool_llm, compact_tool_results
+        ),
+        False: create_analyst_chains(
+            prompt, llm, offline_tools, tool_llm, compact_tool_results
+        ),
+    }
+
+    def news_analyst_node(state):
+        result = invoke_analyst(
+            chains[bool(toolkit.config["online_tools"])],
+            {
+                "messages": state["messages"],
+                "current_date": state["trade_date"],
+                "ticker": state["company_of_interest"],
+                "incremental_instructions": get_incremental_instructions(state, "news"),
+            },
+            "news",
+        )
 
         report = ""
 
@@ -1,8 +1,45 @@
 import time
 import json
 
+from tradingagents.agents.utils.deadline import select_llm
+from tradingagents.agents.utils.memory import get_past_memories
+
+
+def create_risk_manager(llm, memory, fallback_llm=None):
+    # Static instructions first, so providers can cache the prompt prefix
+    system_prompt = {
+        "role": "system",
+        "content": """As the Risk Management Judge and Debate Facilitator, your goal is to evaluate the debate between three risk analysts—Risky, Neutral, and Safe/Conservative—and determine the best course of action for the trader. Your decision must result in a clear recommendation: Buy, Sell, or Hold. Choose Hold only if strongly justified by specific arguments, not as a fallback when all sides seem valid. Strive for clarity and decisiveness.
+
+Guidelines for Decision-Making:
+1. **Summarize Key Arguments**: Extract the strongest points from each analyst, focusing on relevance to the context.
+2. **Provide Rationale**: Support your recommendation with direct quotes and counterarguments from the debate.
+3. **Refine the Trader's Plan**: Start with the trader's original plan, given below, and adjust it based on the analysts' insights.
+4. **Learn from Past Mistakes**: Use lessons from the past reflections given below to address prior misjudgments and improve the decision you are making now to make sure you don't make a wrong BUY/SELL/HOLD call that loses money.
+
+Deliverables:
+- A clear and actionable recommendation: Buy, Sell, or Hold.
+- Detailed reasoning anchored in the debate and past reflections.
+
+Focus on actionable insights and continuous improvement. Build on past lessons, critically evaluate all perspectives, and ensure each decision advances better outcomes.""",
+    }
+    # For runs without a risk debate: the "lite" graph profile, or a debate
+    # cut by the run deadline
+    no_debate_prompt = {
+        "role": "system",
+        "content": """As the Risk Management Judge, your goal is to review the trader's plan against the analyst reports and determine the best course of action for the trader. There was no debate between risk analysts, so weigh the aggressive, neutral and conservative views yourself. Your decision must result in a clear recommendation: Buy, Sell, or Hold. Choose Hold only if strongly justified by specific evidence, not as a fallback when all sides seem valid. Strive for clarity and decisiveness.
+
+Guidelines for Decision-Making:
+1. **Assess the Risks**: Identify the upside the plan is betting on and the downside it is exposed to, using the analyst reports given below.
+2. **Provide Rationale**: Support your recommendation with specific facts and figures from the reports and the trader's plan.
+3. **Refine the Trader's Plan**: Start with the trader's original plan, given below, and adjust position size, entry and risk controls where the evidence calls for it.
+4. **Learn from Past Mistakes**: Use lessons from the past reflections given below to address prior misjudgments and improve the decision you are making now to make sure you don't make a wrong BUY/SELL/HOLD call that loses money.
+
+Deliverables:
+- A clear and actionable recommendation: Buy, Sell, or Hold.
+- Detailed reasoning anchored in the analyst reports, the trader's plan and past reflections.""",
+    }
 
-def create_risk_manager(llm, memory):
     def risk_manager_node(state) -> dict:
 
         company_name = state["company_of_interest"]
@@ -11,46 +48,70 @@ def create_risk_manager(llm, memory):
         risk_debate_state = state["risk_debate_state"]
         market_research_report = state["market_report"]
         news_report = state["news_report"]
-        fundamentals_report = state["news_report"]
+        fundamentals_report = state["fundamentals_report"]
         sentiment_report = state["sentiment_report"]
         trader_plan = state["investment_plan"]
 
         curr_situation = f"{market_research_report}\n\n{sentiment_report}\n\n{news_report}\n\n{fundamentals_report}"
-        past_memories = memory.get_memories(curr_situation, n_matches=2)
+        past_memories = get_past_memories(
+            state, "risk_manager", memory, curr_situation, n_matches=2
+        )
 
         past_memory_str = ""
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
-        prompt = f"""As the Risk Management Judge and Debate Facilitator, your goal is to evaluate the debate between three risk analysts—Risky, Neutral, and Safe/Conservative—and determine the best course of action for the trader. Your decision must result in a clear recommendation: Buy, Sell, or Hold. Choose Hold only if strongly justified by specific arguments, not as a fallback when all sides seem valid. Strive for clarity and decisiveness.
+        if history:
+            messages = [
+                system_prompt,
+                {
+                    "role": "user",
+                    "content": f"""**Trader's Original Plan:**
+{trader_plan}
 
-Guidelines for Decision-Making:
-1. **Summarize Key Arguments**: Extract the strongest points from each analyst, focusing on relevance to the context.
-2. **Provide Rationale**: Support your recommendation with direct quotes and counterarguments from the debate.
-3. **Refine the Trader's Plan**: Start with the trader's original plan, **{trader_plan}**, and adjust it based on the analysts' insights.
-4. **Learn from Past Mistakes**: Use lessons from **{past_memory_str}** to address prior misjudgments and improve the decision you are making now to make sure you don't make a wrong BUY/SELL/HOLD call that loses money.
-
-Deliverables:
-- A clear and actionable recommendation: Buy, Sell, or Hold.
-- Detailed reasoning anchored in the debate and past reflections.
+**Past Reflections:**
+{past_memory_str}
 
 ---
 
 **Analysts Debate History:**  
-{history}
+{history}""",
+                },
+            ]
+        else:
+            messages = [
+                no_debate_prompt,
+                {
+                    "role": "user",
+                    "content": f"""**Trader's Original Plan:**
+{trader_plan}
+
+**Past Reflections:**
+{past_memory_str}
 
 ---
 
-Focus on actionable insights and continuous improvement. Build on past lessons, critically evaluate all perspectives, and ensure each decision advances better outcomes."""
+**Analyst Reports:**
+Market research report: {market_research_report}
+
+Social media sentiment report: {sentiment_report}
+
+Latest world affairs news: {news_report}
+
+Company fundamentals report: {fundamentals_report}""",
+                },
+            ]
 
-        response = llm.invoke(prompt)
+        # Under a run deadline the quick model may have to stand in
+        response = select_llm("Risk Judge", llm, fallback_llm, 0).invoke(messages)
 
         new_risk_debate_state = {
             "judge_decision": response.content,
             "history": risk_debate_state["history"],
-            "risky_history": risk_debate_state["risky_history"],
-            "safe_history": risk_debate_state["safe_history"],
-            "neutral_history": risk_debate_state["neutral_history"],
+            # The debate may have been skipped under a run deadline
+            "risky_history": risk_debate_state.get("risky_history", ""),
+            "safe_history": risk_debate_state.get("safe_history", ""),
+            "neutral_history": risk_debate_state.get("neutral_history", ""),
             "latest_speaker": "Judge",
             "current_risky_response": risk_debate_state["current_risky_response"],
             "current_safe_response": risk_debate_state["current_safe_response"],
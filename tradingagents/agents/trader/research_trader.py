@@ -0,0 +1,106 @@
+import functools
+import re
+
+from tradingagents.agents.utils.memory import get_past_memories
+
+
+# Section headings of the answer, optionally in markdown bold or as a header
+_HEADING = re.compile(
+    r"^[#*_ \t]*(Bull Case|Bear Case|Recommendation|Rationale|Strategic Actions)[*_ \t]*:[*_]*",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def split_sections(text):
+    """Map each section heading of a research trader answer (lower case) to
+    its text; headings the answer lacks are missing."""
+    headings = list(_HEADING.finditer(text))
+    sections = {}
+    for heading, following in zip(headings, headings[1:] + [None]):
+        end = following.start() if following else len(text)
+        sections.setdefault(heading.group(1).lower(), text[heading.end() : end].strip())
+    return sections
+
+
+def create_research_trader(llm, memory):
+    """Research debate, research manager and trader in a single call.
+
+    Used by the "lite" graph profile. Writes the same state fields as the
+    nodes it stands in for, so logs, reflection and signal processing work
+    unchanged.
+    """
+    # Static instructions first, so providers can cache the prompt prefix
+    system_prompt = {
+        "role": "system",
+        "content": """You are the lead researcher and trader of a trading desk, deciding without a separate bull/bear debate. Weigh the bull case (growth potential, competitive advantages, positive indicators) against the bear case (risks and challenges, competitive weaknesses, negative indicators) using the analyst reports you are given, then commit to an investment plan and a trade.
+
+Structure your answer as:
+Bull Case: The strongest evidence-based arguments for investing.
+Bear Case: The strongest evidence-based arguments against investing.
+Recommendation: Buy, Sell, or Hold. Choose Hold only if it is strongly justified, not as a fallback because both sides have valid points.
+Rationale: Why the winning arguments lead to your conclusion.
+Strategic Actions: Concrete steps for implementing the recommendation, including position sizing and the main risks to watch.
+
+Take into account your past mistakes on similar situations and learn from the reflections you are given. Always conclude your response with 'FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL**' to confirm your recommendation.""",
+    }
+
+    def research_trader_node(state, name):
+        company_name = state["company_of_interest"]
+        market_research_report = state["market_report"]
+        sentiment_report = state["sentiment_report"]
+        news_report = state["news_report"]
+        fundamentals_report = state["fundamentals_report"]
+
+        curr_situation = f"{market_research_report}\n\n{sentiment_report}\n\n{news_report}\n\n{fundamentals_report}"
+        past_memories = get_past_memories(
+            state, "trader", memory, curr_situation, n_matches=2
+        )
+
+        past_memory_str = ""
+        if past_memories:
+            for i, rec in enumerate(past_memories, 1):
+                past_memory_str += rec["recommendation"] + "\n\n"
+        else:
+            past_memory_str = "No past memories found."
+
+        messages = [
+            system_prompt,
+            {
+                "role": "user",
+                "content": f"""Here are the analyst reports for {company_name}:
+
+Market research report: {market_research_report}
+Social media sentiment report: {sentiment_report}
+Latest world affairs news: {news_report}
+Company fundamentals report: {fundamentals_report}
+Reflections from similar situations and lessons learned: {past_memory_str}""",
+            },
+        ]
+
+        result = llm.invoke(messages)
+
+        argument = f"{name}: {result.content}"
+
+        # Bull and bear histories get their own section, so reflection
+        # learns different lessons for each; left empty if it is missing
+        sections = split_sections(result.content)
+        bull_case = sections.get("bull case")
+        bear_case = sections.get("bear case")
+        new_investment_debate_state = {
+            "history": argument,
+            "bull_history": f"Bull Analyst: {bull_case}" if bull_case else "",
+            "bear_history": f"Bear Analyst: {bear_case}" if bear_case else "",
+            "current_response": argument,
+            "judge_decision": result.content,
+            "count": 1,
+        }
+
+        return {
+            "messages": [result],
+            "investment_debate_state": new_investment_debate_state,
+            "investment_plan": result.content,
+            "trader_investment_plan": result.content,
+            "sender": name,
+        }
+
+    return functools.partial(research_trader_node, name="Research Trader")
@@ -1,9 +1,6 @@
 from typing import Annotated, Sequence
 from datetime import date, timedelta, datetime
 from typing_extensions import TypedDict, Optional
-from langchain_openai import ChatOpenAI
-from tradingagents.agents import *
-from langgraph.prebuilt import ToolNode
 from langgraph.graph import END, StateGraph, START, MessagesState
 
 
@@ -61,6 +58,18 @@ class AgentState(MessagesState):
     ]
     fundamentals_report: Annotated[str, "Report from the Fundamentals Researcher"]
 
+    # what a run with a deadline skipped, filled in after the run
+    deadline_report: Annotated[dict, "Deadline budget and skipped work"]
+
+    # condensed analyst reports for downstream prompts, keyed by report field
+    report_digest: Annotated[dict, "Digest of each analyst report"]
+
+    # earlier reports the analysts update in incremental mode, keyed by analyst
+    previous_reports: Annotated[dict, "Previous reports per analyst"]
+
+    # memories matched against the analyst reports, keyed by component
+    past_memories: Annotated[dict, "Prefetched memory matches per component"]
+
     # researcher team discussion step
     investment_debate_state: Annotated[
         InvestDebateState, "Current state of the debate on if to invest or not"
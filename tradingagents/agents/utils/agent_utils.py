@@ -3,17 +3,21 @@ from typing import List
 from typing import Annotated
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import RemoveMessage
-from langchain_core.tools import tool
+from langchain_core.tools import BaseTool, tool
 from datetime import date, timedelta, datetime
 import functools
-import pandas as pd
-import os
-from dateutil.relativedelta import relativedelta
-from langchain_openai import ChatOpenAI
-import tradingagents.dataflows.interface as interface
+import json
+from tradingagents.lazy_import import lazy_import
 from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.dataflows.config import get_config, set_config, use_config
+from tradingagents.agents.utils.memory import get_situation
+from tradingagents.agents.utils.deadline import get_budget
 from langchain_core.messages import HumanMessage
 
+# The dataflows pull in pandas, yfinance, stockstats and the vendor clients;
+# they are only needed once a tool is actually called.
+interface = lazy_import("tradingagents.dataflows.interface")
+
 
 def create_msg_delete():
     def delete_messages(state):
@@ -31,22 +35,224 @@ def create_msg_delete():
     return delete_messages
 
 
-class Toolkit:
-    _config = DEFAULT_CONFIG.copy()
+def create_memory_prefetch(memory_hub, n_matches=2):
+    def prefetch_memories(state):
+        """Match the analyst reports against every memory once per run"""
+        return {
+            "past_memories": memory_hub.get_memories(
+                get_situation(state), n_matches=n_matches
+            )
+        }
+
+    return prefetch_memories
+
+
+def get_incremental_instructions(state, analyst):
+    """Prompt addendum asking an analyst to update its previous report.
+
+    Returns "" unless the run found a previous report of this analyst that
+    is fresh enough to build on (see ReportStore.get_previous).
+    """
+    previous = (state.get("previous_reports") or {}).get(analyst)
+    if not previous:
+        return ""
+    return (
+        f" This is an incremental update of your report from {previous['date']}, reproduced below."
+        f" Only retrieve data that is new since {previous['date']} (new price bars, news, posts and filings),"
+        " using it as the start of the requested date range where the tool allows."
+        " Then write the complete updated report: revise what the new data changes and keep the rest."
+        f"\n\nReport from {previous['date']}:\n{previous['report']}\n\n"
+    )
+
+
+def _compact_tool_output(message, max_chars):
+    """Head and tail lines of a long tool result, within about max_chars."""
+    content = str(message.content)
+    lines = content.splitlines()
+    head, tail = [], []
+    budget = max_chars // 2
+    for line in lines:
+        if budget - len(line) - 1 < 0:
+            break
+        head.append(line)
+        budget -= len(line) + 1
+    budget = max_chars // 2
+    for line in reversed(lines[len(head):]):
+        if budget - len(line) - 1 < 0:
+            break
+        tail.insert(0, line)
+        budget -= len(line) + 1
+    if not head and not tail:
+        # A single long line, e.g. a JSON dump
+        head, tail = [content[: max_chars // 2]], [content[-(max_chars // 2):]]
+
+    omitted = len(content) - sum(len(line) + 1 for line in head + tail)
+    return "\n".join(
+        head
+        + [
+            f"[... {omitted} characters of {message.name or 'tool'} output omitted;"
+            " the full result was in an earlier turn ...]"
+        ]
+        + tail
+    )
+
+
+def compact_tool_messages(messages, max_chars=2000):
+    """Shorten tool results the model has already seen.
+
+    A tool result before the latest AI message was part of the prompt that
+    produced it, so later turns get a head/tail excerpt of it instead of the
+    full output. Results the model has not answered yet are kept as is, as
+    is the conversation in the graph state.
+    """
+    last_ai = max(
+        (i for i, m in enumerate(messages) if isinstance(m, AIMessage)), default=-1
+    )
+    compacted = []
+    for i, message in enumerate(messages):
+        if (
+            i < last_ai
+            and isinstance(message, ToolMessage)
+            and len(str(message.content)) > max_chars
+        ):
+            message = message.model_copy(
+                update={"content": _compact_tool_output(message, max_chars)}
+            )
+        compacted.append(message)
+    return compacted
+
+
+def tool_exchanges_as_text(messages):
+    """Rewrite tool calls and tool results as plain conversation.
+
+    For a model called without tools: providers such as Anthropic reject
+    tool call/result blocks in the history unless tools are defined.
+    """
+    converted = []
+    for message in messages:
+        if isinstance(message, AIMessage) and message.tool_calls:
+            calls = ", ".join(
+                f"{call['name']}({json.dumps(call['args'])})" for call in message.tool_calls
+            )
+            text = f"{message.content}\n\n" if message.content else ""
+            converted.append(AIMessage(content=f"{text}Called tools: {calls}"))
+        elif isinstance(message, ToolMessage):
+            converted.append(
+                HumanMessage(content=f"Result of {message.name or 'tool'}:\n{message.content}")
+            )
+        else:
+            converted.append(message)
+    return converted
+
+
+def create_analyst_chains(prompt, llm, tools, tool_llm=None, compact_tool_results=None):
+    """Bind an analyst's tools once, at graph build time.
+
+    Returns:
+        (chain, tool_chain, report_chain, compact_tool_results): prompt |
+        model with tools bound, the same for tool_llm (None without one),
+        prompt | llm without tools for writing the report from the data
+        gathered so far, and the size answered tool results are shortened
+        to (None to keep them whole)
+    """
+    prompt = prompt.partial(tool_names=", ".join([tool.name for tool in tools]))
+    chain = prompt | llm.bind_tools(tools)
+    tool_chain = prompt | tool_llm.bind_tools(tools) if tool_llm is not None else None
+    return chain, tool_chain, prompt | llm, compact_tool_results
+
+
+def invoke_analyst(chains, inputs, analyst=None):
+    """Run one turn of an analyst's tool loop.
+
+    chains comes from create_analyst_chains and inputs fills the prompt
+    variables, including the conversation as "messages". With a tool_llm,
+    the tool-selection turn (no tool results waiting) goes to that cheaper
+    model; once tool results are waiting, llm reads them and writes the
+    report or asks for more. Should the cheap model answer without calling
+    a tool, llm takes the turn instead.
+
+    With compact_tool_results set, tool results from earlier turns are
+    shortened first (see compact_tool_messages).
+
+    Under a run deadline that no longer leaves time for the decision stage,
+    the analyst writes its report from the tool results it already has, or
+    is skipped with an empty report if it has none. That last call has no
+    tools bound, so it gets the tool exchanges as plain text.
+    """
+    chain, tool_chain, report_chain, compact_tool_results = chains
+    budget = get_budget()
+    write_report = False
+    if budget is not None and not budget.can_afford(1 + budget.decision_calls):
+        if not any(isinstance(m, ToolMessage) for m in inputs["messages"]):
+            budget.skip(f"{analyst} analyst", "skipped")
+            return AIMessage(content="")
+        budget.skip(f"{analyst} analyst", "stopped calling tools")
+        chain, tool_chain = report_chain, None
+        write_report = True
+
+    if compact_tool_results:
+        inputs = dict(
+            inputs, messages=compact_tool_messages(inputs["messages"], compact_tool_results)
+        )
+    if write_report:
+        inputs = dict(inputs, messages=tool_exchanges_as_text(inputs["messages"]))
+    messages = inputs["messages"]
+    if tool_chain is not None and not (messages and isinstance(messages[-1], ToolMessage)):
+        result = tool_chain.invoke(inputs)
+        if result.tool_calls:
+            return result
+    return chain.invoke(inputs)
 
-    @classmethod
-    def update_config(cls, config):
-        """Update the class-level configuration."""
-        cls._config.update(config)
 
-    @property
-    def config(self):
-        """Access the configuration."""
-        return self._config
+class _class_or_instance_method:
+    """Method bound to the instance when called on one, else to the class."""
+
+    def __init__(self, func):
+        self.func = func
 
+    def __get__(self, obj, cls=None):
+        return self.func.__get__(obj if obj is not None else cls)
+
+
+class Toolkit:
     def __init__(self, config=None):
-        if config:
-            self.update_config(config)
+        # Per-instance, so graphs with different configs don't clobber each other
+        self._config = {**DEFAULT_CONFIG, **config} if config else None
+        # The tools are shared static functions reading get_config(); this
+        # instance's copies run them under its own config
+        for name in dir(type(self)):
+            attr = getattr(type(self), name)
+            if isinstance(attr, BaseTool):
+                setattr(self, name, self._bind_tool(attr))
+
+    def _bind_tool(self, shared_tool):
+        func = shared_tool.func
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            if self._config is None:
+                return func(*args, **kwargs)
+            with use_config(self._config):
+                return func(*args, **kwargs)
+
+        return shared_tool.model_copy(update={"func": run})
+
+    @_class_or_instance_method
+    def update_config(self_or_cls, config):
+        """Update this toolkit's configuration.
+
+        Called on the class, as in older versions, it updates the
+        process-wide configuration used by toolkits without their own.
+        """
+        if isinstance(self_or_cls, type):
+            set_config(config)
+        else:
+            self_or_cls._config = {**(self_or_cls._config or get_config()), **config}
+
+    @property
+    def config(self):
+        """Access the configuration: this toolkit's own, or the current run's."""
+        return self._config if self._config is not None else get_config()
 
     @staticmethod
     @tool
@@ -0,0 +1,188 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# LLM calls the shortest decision path still needs after the analysts, per
+# graph profile. Full: one bull/bear round, the research manager, the trader
+# and the risk judge. Lite: the research trader and the risk judge.
+DECISION_CALLS = {"full": 5, "lite": 2}
+
+
+class DeadlineExceeded(TimeoutError):
+    """An LLM call was cut off because the run ran out of time."""
+
+
+class RunBudget:
+    """Latency budget of one propagate.
+
+    Nodes and routing functions ask whether the remaining time still
+    affords a number of LLM calls, estimated from the calls of this run so
+    far, and degrade when it does not. Every degradation is recorded with
+    skip() so the caller can see what the decision was based on.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        call_estimate: float = 10.0,
+        min_call_timeout: float = 5.0,
+        decision_calls: int = DECISION_CALLS["full"],
+    ):
+        """Start the clock.
+
+        Args:
+            seconds: Wall time allowed for the run
+            call_estimate: Assumed seconds per LLM call until calls are timed
+            min_call_timeout: Lower bound for the timeout of a single call
+            decision_calls: LLM calls to keep time for after the analysts
+        """
+        self.seconds = seconds
+        self.decision_calls = decision_calls
+        self.call_estimate = call_estimate
+        self.min_call_timeout = min_call_timeout
+        self.start = time.perf_counter()
+        self.deadline = self.start + seconds
+        self.skipped: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # model -> [calls, total seconds]
+        self._calls: Dict[Optional[str], List[float]] = {}
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def remaining(self) -> float:
+        return self.deadline - time.perf_counter()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def record_call(self, model: Optional[str], seconds: float):
+        """Time one finished LLM call."""
+        with self._lock:
+            calls = self._calls.setdefault(model, [0, 0.0])
+            calls[0] += 1
+            calls[1] += seconds
+
+    def call_seconds(self, model: Optional[str] = None) -> float:
+        """Mean duration of model's calls, else of all calls, else the estimate."""
+        with self._lock:
+            calls = self._calls.get(model)
+            if not calls:
+                count = sum(c[0] for c in self._calls.values())
+                total = sum(c[1] for c in self._calls.values())
+                calls = [count, total]
+        return calls[1] / calls[0] if calls[0] else self.call_estimate
+
+    def can_afford(self, calls: int, model: Optional[str] = None) -> bool:
+        """Whether the remaining time fits calls more LLM calls."""
+        return self.remaining() >= calls * self.call_seconds(model)
+
+    def call_timeout(self) -> float:
+        """Timeout for the next LLM call."""
+        return max(self.remaining(), self.min_call_timeout)
+
+    def skip(self, stage: str, action: str):
+        """Record a degradation, once per stage and action."""
+        with self._lock:
+            if any(s["stage"] == stage and s["action"] == action for s in self.skipped):
+                return
+            self.skipped.append(
+                {
+                    "stage": stage,
+                    "action": action,
+                    "elapsed": round(self.elapsed(), 3),
+                    "remaining": round(self.remaining(), 3),
+                }
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "deadline_seconds": self.seconds,
+            "elapsed": round(self.elapsed(), 3),
+            "exceeded": self.expired(),
+            "skipped": list(self.skipped),
+        }
+
+
+class BudgetCallbackHandler(BaseCallbackHandler):
+    """Times the LLM calls of a run into its RunBudget, per model."""
+
+    def __init__(self, budget: RunBudget):
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._started: Dict[Any, Any] = {}
+
+    def _start(self, run_id, metadata):
+        with self._lock:
+            self._started[run_id] = (
+                (metadata or {}).get("ls_model_name"),
+                time.perf_counter(),
+            )
+
+    def _end(self, run_id):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        if started is not None:
+            model, start = started
+            self.budget.record_call(model, time.perf_counter() - start)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+
+# Budget of the run executing in the current context, see use_config() for
+# how context variables reach the graph's worker threads
+_run_budget: contextvars.ContextVar[Optional[RunBudget]] = contextvars.ContextVar(
+    "tradingagents_budget", default=None
+)
+
+
+def get_budget() -> Optional[RunBudget]:
+    """Budget of the current run, or None if it has no deadline."""
+    return _run_budget.get()
+
+
+@contextmanager
+def use_budget(budget: Optional[RunBudget]):
+    """Bind budget to the current context, e.g. for one propagate."""
+    token = _run_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _run_budget.reset(token)
+
+
+def model_name(llm) -> Optional[str]:
+    """Model name an LLM's calls are timed under."""
+    try:
+        return llm._get_ls_params().get("ls_model_name")
+    except Exception:
+        return None
+
+
+def select_llm(stage: str, llm, fallback_llm=None, calls_after: int = 0):
+    """llm, or fallback_llm if the budget no longer affords llm's call.
+
+    calls_after is the number of calls still needed after this one.
+    """
+    budget = get_budget()
+    if budget is None or fallback_llm is None or fallback_llm is llm:
+        return llm
+    needed = budget.call_seconds(model_name(llm)) + calls_after * budget.call_seconds()
+    if budget.remaining() >= needed:
+        return llm
+    budget.skip(stage, "used the quick thinking model")
+    return fallback_llm
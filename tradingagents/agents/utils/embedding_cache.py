@@ -0,0 +1,96 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+
+# One cache per storage location, shared by every memory in the process.
+_caches = {}
+_caches_lock = threading.Lock()
+
+# Keys per SELECT, below SQLite's bound-variable limit (999 on older builds)
+_QUERY_CHUNK = 500
+
+
+class EmbeddingCache:
+    """Content-hash keyed embedding cache, optionally persisted to SQLite.
+
+    At most max_entries embeddings are kept in memory, least recently used
+    first out; with a path, SQLite serves the ones evicted.
+    """
+
+    def __init__(self, path=None, max_entries=4096):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_entries = max_entries
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model, text):
+        """Hash the model name and text into a cache key."""
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """Return a dict of the cached embeddings among keys."""
+        with self._lock:
+            found = {}
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+            missing = [key for key in keys if key not in found]
+            if self._conn is None:
+                return found
+            for start in range(0, len(missing), _QUERY_CHUNK):
+                chunk = missing[start : start + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    embedding = array("d", blob).tolist()
+                    self._remember(key, embedding)
+                    found[key] = embedding
+        return found
+
+    def _remember(self, key, embedding):
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put_many(self, items):
+        """Store (key, embedding) pairs."""
+        items = list(items)
+        with self._lock:
+            for key, embedding in items:
+                self._remember(key, list(embedding))
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                    [(key, array("d", embedding).tobytes()) for key, embedding in items],
+                )
+                self._conn.commit()
+
+
+def get_embedding_cache(path=None, max_entries=4096):
+    """Return the process-wide embedding cache for path, creating it on first use.
+
+    max_entries only applies when the cache is created.
+    """
+    key = os.path.abspath(path) if path else None
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(key, max_entries)
+            _caches[key] = cache
+    return cache
@@ -1,59 +1,224 @@
-import chromadb
-from chromadb.config import Settings
-from openai import OpenAI
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .vector_index import HashingEmbedding, NumpyCollection
+
+# One Chroma client per storage location (and one numpy collection per
+# location and name), shared by every memory and every TradingAgentsGraph
+# in the process.
+_chroma_clients = {}
+_numpy_collections = {}
+_chroma_lock = threading.Lock()
+
+
+def get_chroma_client(path=None):
+    """Return the process-wide Chroma client for path, creating it on first use.
+
+    With a path the store is persisted on disk and reloaded on the next start;
+    without one it lives in memory for the lifetime of the process.
+    """
+    # chromadb is heavy and unused by the numpy backend, so import it lazily
+    import chromadb
+    from chromadb.config import Settings
+
+    key = os.path.abspath(path) if path else None
+    with _chroma_lock:
+        client = _chroma_clients.get(key)
+        if client is None:
+            settings = Settings(allow_reset=True, anonymized_telemetry=False)
+            if key:
+                os.makedirs(key, exist_ok=True)
+                client = chromadb.PersistentClient(path=key, settings=settings)
+            else:
+                client = chromadb.Client(settings)
+            _chroma_clients[key] = client
+    return client
+
+
+def get_numpy_collection(path, name, ann_threshold=10000, nprobe=8):
+    """Return the process-wide numpy collection called name under path."""
+    key = (os.path.abspath(path) if path else None, name)
+    with _chroma_lock:
+        collection = _numpy_collections.get(key)
+        if collection is None:
+            collection = NumpyCollection(
+                os.path.join(key[0], name) if key[0] else None,
+                ann_threshold=ann_threshold,
+                nprobe=nprobe,
+            )
+            _numpy_collections[key] = collection
+    return collection
 
 
 class FinancialSituationMemory:
     def __init__(self, name, config):
-        if config["backend_url"] == "http://localhost:11434/v1":
-            self.embedding = "nomic-embed-text"
+        # A local embedding function (a callable mapping a list of texts to a
+        # list of vectors, or "hashing") keeps retrieval fully offline.
+        self.embedding_function = config.get("embedding_function")
+        if self.embedding_function == "hashing":
+            self.embedding_function = HashingEmbedding()
+
+        if self.embedding_function is not None:
+            self.embedding = getattr(
+                self.embedding_function,
+                "name",
+                getattr(self.embedding_function, "__name__", "custom"),
+            )
+            self.client = None
         else:
-            self.embedding = "text-embedding-3-small"
-        self.client = OpenAI(base_url=config["backend_url"])
-        self.chroma_client = chromadb.Client(Settings(allow_reset=True))
-        self.situation_collection = self.chroma_client.create_collection(name=name)
+            if config["backend_url"] == "http://localhost:11434/v1":
+                self.embedding = "nomic-embed-text"
+            else:
+                self.embedding = "text-embedding-3-small"
+            from openai import OpenAI
+
+            self.client = OpenAI(base_url=config["backend_url"])
+        # OpenAI accepts up to 2048 inputs per embeddings request
+        self.embedding_batch_size = config.get("embedding_batch_size", 256)
+        self.embedding_max_concurrency = config.get("embedding_max_concurrency", 4)
+        # Vectors from different embedding models cannot share a collection
+        memory_dir = config.get("memory_dir")
+        if memory_dir:
+            memory_dir = os.path.join(memory_dir, self.embedding)
+        if config.get("memory_backend", "chroma") == "numpy":
+            self.chroma_client = None
+            self.situation_collection = get_numpy_collection(
+                memory_dir,
+                name,
+                ann_threshold=config.get("memory_ann_threshold", 10000),
+                nprobe=config.get("memory_ann_nprobe", 8),
+            )
+        else:
+            self.chroma_client = get_chroma_client(memory_dir)
+            self.situation_collection = self.chroma_client.get_or_create_collection(
+                name=name
+            )
+        # Every researcher/manager embeds the same situation text, so the cache
+        # is shared by all memories and persisted next to the vector store.
+        self.embedding_cache = None
+        if config.get("embedding_cache", True):
+            self.embedding_cache = get_embedding_cache(
+                os.path.join(memory_dir, "embedding_cache.sqlite")
+                if memory_dir
+                else None,
+                config.get("embedding_cache_max_entries", 4096),
+            )
 
     def get_embedding(self, text):
         """Get OpenAI embedding for a text"""
-        
-        response = self.client.embeddings.create(
-            model=self.embedding, input=text
-        )
-        return response.data[0].embedding
+
+        return self.get_embeddings([text])[0]
+
+    def _embed_batch(self, texts):
+        """Get OpenAI embeddings for one request's worth of texts"""
+
+        if self.embedding_function is not None:
+            return self.embedding_function(texts)
+
+        response = self.client.embeddings.create(model=self.embedding, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    def get_embeddings(self, texts):
+        """Get OpenAI embeddings for many texts, only requesting ones not in the cache"""
+
+        texts = list(texts)
+        if self.embedding_cache is None:
+            return self._embed_uncached(texts)
+
+        keys = [EmbeddingCache.make_key(self.embedding, text) for text in texts]
+        cached = self.embedding_cache.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            fresh = dict(zip(missing, self._embed_uncached(list(missing.values()))))
+            self.embedding_cache.put_many(fresh.items())
+            cached.update(fresh)
+
+        return [cached[key] for key in keys]
+
+    def _embed_uncached(self, texts):
+        """Get OpenAI embeddings for many texts, chunked to the provider's input limit"""
+
+        chunks = [
+            texts[i : i + self.embedding_batch_size]
+            for i in range(0, len(texts), self.embedding_batch_size)
+        ]
+        if len(chunks) <= 1:
+            return self._embed_batch(chunks[0]) if chunks else []
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.embedding_max_concurrency, len(chunks))
+        ) as executor:
+            results = executor.map(self._embed_batch, chunks)
+
+        return [embedding for chunk in results for embedding in chunk]
+
+    def _get_insert_batch_size(self):
+        """Largest insert the vector store accepts in one call"""
+
+        get_max_batch_size = getattr(self.chroma_client, "get_max_batch_size", None)
+        if get_max_batch_size is None:
+            return self.embedding_batch_size
+        return min(self.embedding_batch_size, get_max_batch_size())
 
     def add_situations(self, situations_and_advice):
         """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
 
         situations = []
         advice = []
-        ids = []
-        embeddings = []
 
-        offset = self.situation_collection.count()
-
-        for i, (situation, recommendation) in enumerate(situations_and_advice):
+        for situation, recommendation in situations_and_advice:
             situations.append(situation)
             advice.append(recommendation)
-            ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
-
-        self.situation_collection.add(
-            documents=situations,
-            metadatas=[{"recommendation": rec} for rec in advice],
-            embeddings=embeddings,
-            ids=ids,
-        )
+
+        if not situations:
+            return
+
+        embeddings = self.get_embeddings(situations)
+
+        # The on-disk store may be shared by other graphs and processes;
+        # count()-based ids could collide there, and Chroma silently drops
+        # records with duplicate ids
+        ids = [uuid.uuid4().hex for _ in situations]
+
+        batch_size = self._get_insert_batch_size()
+        for start in range(0, len(situations), batch_size):
+            end = start + batch_size
+            self.situation_collection.add(
+                documents=situations[start:end],
+                metadatas=[{"recommendation": rec} for rec in advice[start:end]],
+                embeddings=embeddings[start:end],
+                ids=ids[start:end],
+            )
 
     def get_memories(self, current_situation, n_matches=1):
         """Find matching recommendations using OpenAI embeddings"""
         query_embedding = self.get_embedding(current_situation)
 
+        return self.get_memories_by_embedding(query_embedding, n_matches)
+
+    def get_memories_by_embedding(self, query_embedding, n_matches=1):
+        """Find matching recommendations for an already computed embedding"""
         results = self.situation_collection.query(
             query_embeddings=[query_embedding],
             n_results=n_matches,
             include=["metadatas", "documents", "distances"],
         )
 
+        return self.format_results(results)
+
+    @staticmethod
+    def format_results(results):
+        """Convert a single-query collection result into match dicts"""
         matched_results = []
         for i in range(len(results["documents"][0])):
             matched_results.append(
@@ -67,6 +232,97 @@ class FinancialSituationMemory:
         return matched_results
 
 
+def get_situation(state):
+    """The situation text every memory-backed agent matches against."""
+    return f"{state['market_report']}\n\n{state['sentiment_report']}\n\n{state['news_report']}\n\n{state['fundamentals_report']}"
+
+
+def get_past_memories(state, component, memory, current_situation, n_matches=2):
+    """Return the matches prefetched into the state, querying memory if absent."""
+    prefetched = (state.get("past_memories") or {}).get(component)
+    if prefetched is not None:
+        return prefetched
+    return memory.get_memories(current_situation, n_matches=n_matches)
+
+
+class MemoryHub:
+    """Queries several memories for the same situation in one pass.
+
+    The situation is embedded once per embedding model. Numpy-backed
+    collections that are still brute-force are searched with a single matrix
+    product over their stacked vectors; any other collection is queried
+    individually with the shared embedding.
+    """
+
+    def __init__(self, memories):
+        self.memories = memories
+        self._stack = (None, None, None)
+
+    def _stacked(self, collections):
+        """Stacked vectors and row offsets of collections, rebuilt on change."""
+        key = tuple((id(c), c.count()) for c in collections)
+        stack_key, stack, offsets = self._stack
+        if key != stack_key:
+            matrices = [c.index.vectors for c in collections if c.count()]
+            stack = np.concatenate(matrices) if matrices else None
+            offsets = np.cumsum([0] + [count for _, count in key])
+            self._stack = (key, stack, offsets)
+        return stack, offsets
+
+    def _query_stacked(self, collections, query_embedding, n_matches):
+        stack, offsets = self._stacked(collections)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = stack @ query if stack is not None else np.zeros(0, np.float32)
+
+        results = []
+        for c, collection in enumerate(collections):
+            segment = scores[offsets[c] : offsets[c + 1]]
+            k = min(n_matches, len(segment))
+            top = np.argpartition(-segment, k - 1)[:k] if k else np.array([], int)
+            top = top[np.argsort(-segment[top])]
+            results.append(
+                {
+                    "documents": [[collection.documents[i] for i in top]],
+                    "metadatas": [[collection.metadatas[i] for i in top]],
+                    "distances": [[1.0 - float(segment[i]) for i in top]],
+                }
+            )
+        return results
+
+    def get_memories(self, current_situation, n_matches=1):
+        """Return {component: matches} for every memory in the hub."""
+        by_embedding = {}
+        for component, memory in self.memories.items():
+            by_embedding.setdefault(memory.embedding, []).append(component)
+
+        matches = {}
+        for components in by_embedding.values():
+            memories = [self.memories[c] for c in components]
+            query_embedding = memories[0].get_embedding(current_situation)
+
+            collections = [m.situation_collection for m in memories]
+            stackable = all(
+                isinstance(c, NumpyCollection) and c.index._centroids is None
+                for c in collections
+            )
+            if stackable:
+                for component, results in zip(
+                    components,
+                    self._query_stacked(collections, query_embedding, n_matches),
+                ):
+                    matches[component] = FinancialSituationMemory.format_results(
+                        results
+                    )
+            else:
+                for component, memory in zip(components, memories):
+                    matches[component] = memory.get_memories_by_embedding(
+                        query_embedding, n_matches
+                    )
+
+        return matches
+
+
 if __name__ == "__main__":
     # Example usage
     matcher = FinancialSituationMemory()
@@ -0,0 +1,73 @@
+from tradingagents.agents.utils.deadline import get_budget
+from tradingagents.agents.utils.report_store import REPORT_FIELDS
+
+REPORT_TITLES = {
+    "market_report": "market research report",
+    "sentiment_report": "social media sentiment report",
+    "news_report": "world affairs news report",
+    "fundamentals_report": "company fundamentals report",
+}
+
+
+def get_analyst_reports(state, use_digest=False):
+    """The market, sentiment, news and fundamentals reports, in that order.
+
+    With use_digest, each report is replaced by its digest when the run has
+    one (see create_report_digest).
+    """
+    digest = (state.get("report_digest") or {}) if use_digest else {}
+    return tuple(digest.get(field) or state[field] for field in REPORT_FIELDS.values())
+
+
+def _truncate(text, max_chars):
+    """Cut text to max_chars at the last line, sentence or word break."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    # Only breaks in the second half, so a long last line isn't lost whole
+    floor = max_chars // 2
+    line = cut.rfind("\n")
+    if line >= floor:
+        return cut[:line].rstrip()
+    sentence = max(cut.rfind(end) for end in (". ", "! ", "? "))
+    if sentence >= floor:
+        return cut[: sentence + 1]
+    word = cut.rfind(" ")
+    return cut[:word].rstrip() if word >= floor else cut
+
+
+def create_report_digest(llm, max_tokens=400):
+    def report_digest_node(state) -> dict:
+        max_words = int(max_tokens * 0.75)
+        max_chars = max_tokens * 4
+
+        digest = {}
+        pending = []
+        for field in REPORT_FIELDS.values():
+            report = state.get(field) or ""
+            if len(report) <= max_chars:
+                # Short enough to pass on as is
+                digest[field] = report
+            else:
+                pending.append(field)
+
+        budget = get_budget()
+        if pending and budget is not None and not budget.can_afford(1 + budget.decision_calls):
+            # The debaters fall back to the full reports
+            budget.skip("Report Digest", "skipped")
+            return {"report_digest": {}}
+
+        if pending:
+            prompts = [
+                f"""You are condensing a {REPORT_TITLES[field]} for the researchers and risk analysts of a trading desk. Rewrite it as a digest of at most {max_words} words: short bullet points with the key facts, figures, price levels, dates, signals and the analyst's conclusion. Keep every number that matters; drop methodology, repetition and restated tables.
+
+{state[field]}"""
+                for field in pending
+            ]
+            for field, response in zip(pending, llm.batch(prompts)):
+                # Hard bound in case the model overshoots
+                digest[field] = _truncate(response.content, max_chars)
+
+        return {"report_digest": digest}
+
+    return report_digest_node
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+from datetime import datetime
+from urllib.parse import quote
+
+# Analyst type -> AgentState field holding its report
+REPORT_FIELDS = {
+    "market": "market_report",
+    "social": "sentiment_report",
+    "news": "news_report",
+    "fundamentals": "fundamentals_report",
+}
+
+
+def _parse_date(value):
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+
+
+class ReportStore:
+    """Analyst reports of past runs, per ticker and date, for incremental runs.
+
+    Each stored report records how many incremental updates it is away from
+    the last full rebuild, which drives the freshness policy.
+    """
+
+    def __init__(self, path=None):
+        """Keep reports in memory, and as one JSON file per ticker under path if set."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._tickers = {}
+
+    def _file(self, ticker):
+        # Percent-encoded, so a ticker like "../x" or "BRK/B" stays one file
+        # under path
+        return os.path.join(self.path, f"{quote(str(ticker), safe='')}.json")
+
+    def _load(self, ticker):
+        if ticker not in self._tickers:
+            reports = {}
+            if self.path:
+                file = self._file(ticker)
+                if os.path.exists(file):
+                    with open(file) as f:
+                        reports = json.load(f)
+            self._tickers[ticker] = reports
+        return self._tickers[ticker]
+
+    def get_previous(self, ticker, trade_date, analysts, max_gap_days=3, refresh_every=5):
+        """Latest earlier report per analyst that may be updated incrementally.
+
+        A report is skipped, forcing a full refresh, when it is more than
+        max_gap_days older than trade_date or already refresh_every
+        incremental updates away from its last full rebuild.
+
+        Returns:
+            Dict of analyst -> {"date", "report", "increments"}
+        """
+        current = _parse_date(trade_date)
+        with self._lock:
+            reports = self._load(ticker)
+            earlier = sorted(d for d in reports if _parse_date(d) < current)
+            previous = {}
+            for analyst in analysts:
+                for date in reversed(earlier):
+                    entry = reports[date].get(analyst)
+                    if entry is None:
+                        continue
+                    if (
+                        (current - _parse_date(date)).days <= max_gap_days
+                        and entry["increments"] < refresh_every
+                    ):
+                        previous[analyst] = {"date": date, **entry}
+                    break
+            return previous
+
+    def save(self, ticker, trade_date, state, previous):
+        """Store the reports of a finished run.
+
+        previous is what get_previous() returned for the run; reports built
+        on one of them count one more incremental update. Reports the run's
+        deadline cut short are not stored, so later runs don't build on them.
+        """
+        degraded = {
+            s["stage"].split()[0]
+            for s in (state.get("deadline_report") or {}).get("skipped", [])
+            if s["stage"].endswith(" analyst")
+        }
+        entries = {}
+        for analyst, field in REPORT_FIELDS.items():
+            report = state.get(field)
+            if not report or analyst in degraded:
+                continue
+            increments = previous[analyst]["increments"] + 1 if analyst in previous else 0
+            entries[analyst] = {"report": report, "increments": increments}
+
+        with self._lock:
+            reports = self._load(ticker)
+            reports[str(trade_date)] = entries
+            if self.path:
+                os.makedirs(self.path, exist_ok=True)
+                file = self._file(ticker)
+                with open(f"{file}.tmp", "w") as f:
+                    json.dump(reports, f, indent=4)
+                os.replace(f"{file}.tmp", file)
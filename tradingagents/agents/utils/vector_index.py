@@ -0,0 +1,256 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _hash_bucket(token, dim):
+    digest = int.from_bytes(
+        hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+    return digest % dim, 1.0 if (digest >> 63) & 1 else -1.0
+
+
+class HashingEmbedding:
+    """Offline embedding function based on the hashing trick.
+
+    Unigrams and bigrams are hashed into a fixed number of signed buckets, so
+    no model download or network access is needed. Quality is well below a
+    learned embedding, but identical and near-identical situations still
+    match, which is what memory retrieval mostly relies on.
+    """
+
+    _token_re = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _bucket(self, token):
+        return _hash_bucket(token, self.dim)
+
+    def __call__(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = self._token_re.findall(text.lower())
+            for token in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                index, sign = self._bucket(token)
+                vectors[row, index] += sign
+        return vectors.tolist()
+
+
+class NumpyVectorIndex:
+    """Cosine top-k over a contiguous float32 matrix.
+
+    Below ann_threshold vectors every query is an exact brute-force scan. Above
+    it an inverted-file index (k-means coarse quantizer) restricts each query
+    to the nprobe closest clusters.
+    """
+
+    def __init__(self, ann_threshold=10000, nprobe=8, seed=0):
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self._rng = np.random.default_rng(seed)
+        self._matrix = None
+        self._size = 0
+        self._centroids = None
+        self._assignments = None
+        self._trained_size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def vectors(self):
+        """The normalized vectors currently stored, one per row."""
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._matrix[: self._size]
+
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, vectors):
+        """Append vectors, growing the backing matrix geometrically."""
+        vectors = self._normalize(vectors)
+        if len(vectors) == 0:
+            return
+        if self._matrix is None:
+            self._matrix = np.empty((max(len(vectors), 64), vectors.shape[1]), np.float32)
+        elif vectors.shape[1] != self._matrix.shape[1]:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._matrix.shape[1]}"
+            )
+
+        needed = self._size + len(vectors)
+        if needed > len(self._matrix):
+            grown = np.empty((max(needed, 2 * len(self._matrix)), self._matrix.shape[1]), np.float32)
+            grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+
+        self._matrix[self._size : needed] = vectors
+        self._size = needed
+
+        if self._size >= self.ann_threshold:
+            if self._centroids is None or self._size >= 2 * self._trained_size:
+                self._train()
+            else:
+                new_assignments = self._assign(vectors)
+                self._assignments = np.concatenate([self._assignments, new_assignments])
+
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self._centroids.T, axis=1)
+
+    def _train(self, iterations=10):
+        """Fit the coarse quantizer with spherical k-means."""
+        data = self.vectors
+        n_lists = max(1, int(np.sqrt(len(data))))
+        self._centroids = data[self._rng.choice(len(data), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = self._assign(data)
+            for c in range(n_lists):
+                members = data[assignments == c]
+                if len(members):
+                    self._centroids[c] = members.sum(axis=0)
+            self._centroids = self._normalize(self._centroids)
+        self._assignments = self._assign(data)
+        self._trained_size = len(data)
+
+    def search(self, query, k):
+        """Return (indices, cosine similarities) of the k nearest vectors."""
+        k = min(k, self._size)
+        if k <= 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        query = self._normalize(query)[0]
+        candidates = None
+        if self._centroids is not None:
+            probe = np.argsort(-(self._centroids @ query))[: self.nprobe]
+            candidates = np.flatnonzero(np.isin(self._assignments, probe))
+            if len(candidates) < k:
+                candidates = None
+
+        if candidates is None:
+            scores = self.vectors @ query
+            indices = np.arange(self._size)
+        else:
+            scores = self._matrix[candidates] @ query
+            indices = candidates
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return indices[top], scores[top]
+
+
+class NumpyCollection:
+    """Minimal Chroma-collection lookalike backed by NumpyVectorIndex.
+
+    Implements the count/add/query subset FinancialSituationMemory uses, with
+    cosine distance. When path is given each add appends its vectors to
+    <path>.f32 and its records to <path>.jsonl, so saving costs O(batch)
+    rather than rewriting the collection; both are reloaded on startup.
+    """
+
+    def __init__(self, path=None, ann_threshold=10000, nprobe=8):
+        self.path = path
+        self.index = NumpyVectorIndex(ann_threshold=ann_threshold, nprobe=nprobe)
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self._lock = threading.Lock()
+        if path and (os.path.exists(f"{path}.jsonl") or os.path.exists(f"{path}.f32")):
+            self._load()
+
+    def _load(self):
+        """Load both files, truncating them to the records they agree on.
+
+        An interrupted append can leave a torn last record or vectors without
+        a record. Both files are cut back to the consistent prefix before the
+        next append, otherwise the new records would land on the fragment or
+        pair up with the orphaned vectors.
+        """
+        records, ends = [], []
+        record_path = f"{self.path}.jsonl"
+        if os.path.exists(record_path):
+            with open(record_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+                    offset += len(line)
+                    ends.append(offset)
+        dim = records[0]["dim"] if records else 0
+        vector_path = f"{self.path}.f32"
+        vectors = (
+            np.fromfile(vector_path, dtype=np.float32)
+            if os.path.exists(vector_path)
+            else np.zeros(0, dtype=np.float32)
+        )
+        count = min(len(records), len(vectors) // dim) if dim else 0
+        self._truncate(record_path, ends[count - 1] if count else 0)
+        self._truncate(vector_path, count * dim * vectors.itemsize)
+        if not count:
+            return
+        records = records[:count]
+        self.ids = [r["id"] for r in records]
+        self.documents = [r["document"] for r in records]
+        self.metadatas = [r["metadata"] for r in records]
+        self.index.add(vectors[: count * dim].reshape(count, dim))
+
+    @staticmethod
+    def _truncate(path, size):
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+
+    def _append(self, start):
+        """Persist the records from position start on."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        vectors = self.index.vectors[start:]
+        # Vectors first: records without a vector are dropped on load
+        with open(f"{self.path}.f32", "ab") as f:
+            f.write(np.ascontiguousarray(vectors).tobytes())
+        with open(f"{self.path}.jsonl", "a") as f:
+            for id_, document, metadata in zip(
+                self.ids[start:], self.documents[start:], self.metadatas[start:]
+            ):
+                record = {"id": id_, "document": document, "metadata": metadata, "dim": vectors.shape[1]}
+                f.write(json.dumps(record) + "\n")
+
+    def count(self):
+        return len(self.ids)
+
+    def add(self, documents, metadatas, embeddings, ids):
+        with self._lock:
+            start = len(self.ids)
+            self.index.add(embeddings)
+            self.documents.extend(documents)
+            self.metadatas.extend(metadatas)
+            self.ids.extend(ids)
+            if self.path and len(self.ids) > start:
+                self._append(start)
+
+    def query(self, query_embeddings, n_results=1, include=None):
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query_embedding in query_embeddings:
+            indices, similarities = self.index.search(query_embedding, n_results)
+            results["ids"].append([self.ids[i] for i in indices])
+            results["documents"].append([self.documents[i] for i in indices])
+            results["metadatas"].append([self.metadatas[i] for i in indices])
+            results["distances"].append([1.0 - float(s) for s in similarities])
+        return results
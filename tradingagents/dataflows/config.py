@@ -1,33 +1,69 @@
-import tradingagents.default_config as default_config
+import contextvars
+from contextlib import contextmanager
 from typing import Dict, Optional
 
-# Use default config but allow it to be overridden
+import tradingagents.default_config as default_config
+
+# Process-wide fallback, used outside of any run
 _config: Optional[Dict] = None
-DATA_DIR: Optional[str] = None
+
+# Configuration of the run executing in the current context. Bound by
+# use_config() for the duration of a propagate; LangGraph and the LangChain
+# executors copy the context into their worker threads, so tool calls see
+# the config of the run they belong to even when runs share a process.
+_run_config: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar(
+    "tradingagents_config", default=None
+)
 
 
 def initialize_config():
     """Initialize the configuration with default values."""
-    global _config, DATA_DIR
+    global _config
     if _config is None:
         _config = default_config.DEFAULT_CONFIG.copy()
-        DATA_DIR = _config["data_dir"]
 
 
 def set_config(config: Dict):
-    """Update the configuration with custom values."""
-    global _config, DATA_DIR
+    """Update the process-wide configuration with custom values."""
+    global _config
     if _config is None:
         _config = default_config.DEFAULT_CONFIG.copy()
     _config.update(config)
-    DATA_DIR = _config["data_dir"]
 
 
 def get_config() -> Dict:
-    """Get the current configuration."""
+    """Get the configuration of the current run, or the process-wide one.
+
+    The returned dict is shared, not a copy; treat it as read-only.
+    """
+    config = _run_config.get()
+    if config is not None:
+        return config
     if _config is None:
         initialize_config()
-    return _config.copy()
+    return _config
+
+
+def get_data_dir() -> str:
+    """Get the data directory of the current run."""
+    return get_config()["data_dir"]
+
+
+@contextmanager
+def use_config(config: Dict):
+    """Bind config to the current context, e.g. for one propagate."""
+    token = _run_config.set({**default_config.DEFAULT_CONFIG, **config})
+    try:
+        yield
+    finally:
+        _run_config.reset(token)
+
+
+def __getattr__(name):
+    # DATA_DIR used to be a module global swapped by set_config
+    if name == "DATA_DIR":
+        return get_data_dir()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Initialize with default config
@@ -13,7 +13,7 @@ import pandas as pd
 from tqdm import tqdm
 import yfinance as yf
 from openai import OpenAI
-from .config import get_config, set_config, DATA_DIR
+from .config import get_config, set_config, get_data_dir
 
 
 def get_finnhub_news(
@@ -40,7 +40,7 @@ def get_finnhub_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    result = get_data_in_range(ticker, before, curr_date, "news_data", DATA_DIR)
+    result = get_data_in_range(ticker, before, curr_date, "news_data", get_data_dir())
 
     if len(result) == 0:
         return ""
@@ -79,7 +79,7 @@ def get_finnhub_company_insider_sentiment(
     before = date_obj - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    data = get_data_in_range(ticker, before, curr_date, "insider_senti", DATA_DIR)
+    data = get_data_in_range(ticker, before, curr_date, "insider_senti", get_data_dir())
 
     if len(data) == 0:
         return ""
@@ -120,7 +120,7 @@ def get_finnhub_company_insider_transactions(
     before = date_obj - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    data = get_data_in_range(ticker, before, curr_date, "insider_trans", DATA_DIR)
+    data = get_data_in_range(ticker, before, curr_date, "insider_trans", get_data_dir())
 
     if len(data) == 0:
         return ""
@@ -150,7 +150,7 @@ def get_simfin_balance_sheet(
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
     data_path = os.path.join(
-        DATA_DIR,
+        get_data_dir(),
         "fundamental_data",
         "simfin_data_all",
         "balance_sheet",
@@ -197,7 +197,7 @@ def get_simfin_cashflow(
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
     data_path = os.path.join(
-        DATA_DIR,
+        get_data_dir(),
         "fundamental_data",
         "simfin_data_all",
         "cash_flow",
@@ -244,7 +244,7 @@ def get_simfin_income_statements(
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
     data_path = os.path.join(
-        DATA_DIR,
+        get_data_dir(),
         "fundamental_data",
         "simfin_data_all",
         "income_statements",
@@ -339,7 +339,7 @@ def get_reddit_global_news(
             "global_news",
             curr_date_str,
             max_limit_per_day,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
+            data_path=os.path.join(get_data_dir(), "reddit_data"),
         )
         posts.extend(fetch_result)
         curr_date += relativedelta(days=1)
@@ -397,7 +397,7 @@ def get_reddit_company_news(
             curr_date_str,
             max_limit_per_day,
             ticker,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
+            data_path=os.path.join(get_data_dir(), "reddit_data"),
         )
         posts.extend(fetch_result)
         curr_date += relativedelta(days=1)
@@ -515,7 +515,7 @@ def get_stock_stats_indicators_window(
         # read from YFin data
         data = pd.read_csv(
             os.path.join(
-                DATA_DIR,
+                get_data_dir(),
                 f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
             )
         )
@@ -572,7 +572,7 @@ def get_stockstats_indicator(
             symbol,
             indicator,
             curr_date,
-            os.path.join(DATA_DIR, "market_data", "price_data"),
+            os.path.join(get_data_dir(), "market_data", "price_data"),
             online=online,
         )
     except Exception as e:
@@ -597,7 +597,7 @@ def get_YFin_data_window(
     # read in data
     data = pd.read_csv(
         os.path.join(
-            DATA_DIR,
+            get_data_dir(),
             f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
         )
     )
@@ -675,7 +675,7 @@ def get_YFin_data(
     # read in data
     data = pd.read_csv(
         os.path.join(
-            DATA_DIR,
+            get_data_dir(),
             f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
         )
     )
@@ -3,8 +3,19 @@ import yfinance as yf
 from stockstats import wrap
 from typing import Annotated
 import os
+import threading
 from .config import get_config
 
+# One lock per cache file, so concurrent tool calls for the same symbol
+# download it once instead of racing on a half-written CSV
+_cache_locks = {}
+_cache_locks_guard = threading.Lock()
+
+
+def _cache_lock(path):
+    with _cache_locks_guard:
+        return _cache_locks.setdefault(path, threading.Lock())
+
 
 class StockstatsUtils:
     @staticmethod
@@ -58,20 +69,25 @@ class StockstatsUtils:
                 f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
             )
 
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
-                )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
+            with _cache_lock(data_file):
+                if os.path.exists(data_file):
+                    data = pd.read_csv(data_file)
+                    data["Date"] = pd.to_datetime(data["Date"])
+                else:
+                    data = yf.download(
+                        symbol,
+                        start=start_date,
+                        end=end_date,
+                        multi_level_index=False,
+                        progress=False,
+                        auto_adjust=True,
+                    )
+                    data = data.reset_index()
+                    # Written under a temporary name so readers in other
+                    # processes never see a partial file
+                    tmp_file = f"{data_file}.{os.getpid()}.tmp"
+                    data.to_csv(tmp_file, index=False)
+                    os.replace(tmp_file, data_file)
 
             df = wrap(data)
             df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
@@ -13,10 +13,103 @@ DEFAULT_CONFIG = {
     "deep_think_llm": "o4-mini",
     "quick_think_llm": "gpt-4o-mini",
     "backend_url": "https://api.openai.com/v1",
+    # Cheaper model for analyst tool-selection turns, keyed by analyst type
+    # ("default" covers the rest); once tool results are waiting,
+    # quick_think_llm reads them and writes the report.
+    # e.g. {"default": "gpt-4.1-nano", "market": None}
+    "analyst_tool_llm": {},
+    # Route all LLM requests through the process-wide scheduler
+    "llm_scheduler": True,
+    # {"provider/model" or "provider": {"rpm": ..., "tpm": ..., "max_concurrency": ...}}
+    "llm_rate_limits": {},
+    # Retries of rate-limited and failed requests, done by the scheduler
+    # (the provider clients' own retries are turned off)
+    "llm_max_retries": 5,
+    # Stream responses through the scheduler, which lets the run metrics
+    # record time_to_first_token; needs llm_scheduler
+    "llm_streaming": False,
+    "llm_retry_backoff": 2.0,
     # Debate and discussion settings
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    # End debates early once the positions converge; the round limits above
+    # stay hard caps. Off by default so max_debate_rounds > 1 keeps running
+    # every round.
+    "debate_early_stop": False,
+    "debate_convergence_threshold": 0.8,
+    # Per-run budget of investment + risk debate turns, None for no budget
+    "max_debate_turns": None,
+    # Memory settings
+    # Agent memories are persisted here and shared by every graph in the
+    # process; set to None to keep them in memory only. Defaults to the user
+    # cache directory, the installed package may be read-only.
+    "memory_dir": os.getenv(
+        "TRADINGAGENTS_MEMORY_DIR",
+        os.path.join(
+            os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+            "tradingagents",
+            "memory_store",
+        ),
+    ),
+    # "chroma" or "numpy" (in-process float32 matrix with optional ANN index)
+    "memory_backend": "chroma",
+    "memory_ann_threshold": 10000,
+    "memory_ann_nprobe": 8,
+    # None embeds through backend_url; "hashing" or a callable embeds locally
+    "embedding_function": None,
+    "embedding_cache": True,
+    # Embeddings kept in memory (least recently used evicted first); the
+    # on-disk cache under memory_dir has no limit
+    "embedding_cache_max_entries": 4096,
+    # Query all memories once per run, before the debate starts
+    "prefetch_memories": True,
+    "embedding_batch_size": 256,
+    "embedding_max_concurrency": 4,
+    # Dates whose analyst stage may run ahead in propagate_many
+    "backtest_pipeline_depth": 2,
+    # Incremental analyst reports: update the previous date's report with the
+    # new data instead of rebuilding it, with a forced full refresh once the
+    # previous report is too old or too many updates away from a rebuild
+    "incremental_reports": False,
+    "incremental_analysts": ["market", "social", "news", "fundamentals"],
+    "incremental_max_gap_days": 3,
+    "incremental_refresh_every": 5,
+    # None keeps reports under <results_dir>/report_store
+    "report_store_dir": None,
+    # Condense the analyst reports once after the analyst team; the debaters
+    # then get the digest, except the nodes listed in report_digest_full_text
+    # ("bull", "bear", "risky", "safe", "neutral"). Full graph_profile only,
+    # the lite profile has no debaters and ignores it
+    "report_digest": False,
+    "report_digest_max_tokens": 400,
+    "report_digest_full_text": [],
+    # Graph topology: "full" (sequential analysts, bull/bear debate, research
+    # manager, trader, risk debate, risk judge) or "lite" (parallel analysts,
+    # one combined researcher/trader call, risk judge) for low latency
+    "graph_profile": "full",
+    # Wall-time budget of a propagate in seconds, None for no deadline. Short
+    # on time, a run cuts tool loops and debate rounds, gives the judges the
+    # quick model, and at the deadline decides on the latest plan it has.
+    # Calls are only cut off at the deadline with llm_scheduler on; without
+    # it the run checks the deadline between calls and can overrun by one.
+    "run_deadline": None,
+    # Assumed seconds per LLM call until the run has timed some
+    "deadline_call_estimate": 10.0,
+    "deadline_min_call_timeout": 5.0,
+    # Reflection settings
+    "concurrent_reflection": True,
+    "reflection_max_concurrency": 5,
     # Tool settings
     "online_tools": True,
+    # Worker threads per tool node for the tool calls of one LLM message
+    "tool_max_concurrency": 8,
+    # Shorten tool results an analyst has already answered to about this many
+    # characters in its later turns, bounding the prompt of long tool loops
+    "compact_tool_results": False,
+    "compact_tool_results_chars": 2000,
+    # Record per-node latency and token usage of every propagate
+    "instrumentation": True,
+    # Signal processing settings
+    "signal_min_confidence": 0.75,
 }
@@ -6,6 +6,10 @@ from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .factory import GraphFactory, get_graph
+from .instrumentation import MetricsRecorder, RunMetrics
+from .backtest import PipelinedBacktester
+from .llm_scheduler import LLMScheduler, ScheduledChatModel, get_llm_scheduler
 
 __all__ = [
     "TradingAgentsGraph",
@@ -14,4 +18,12 @@ __all__ = [
     "Propagator",
     "Reflector",
     "SignalProcessor",
+    "GraphFactory",
+    "get_graph",
+    "MetricsRecorder",
+    "RunMetrics",
+    "PipelinedBacktester",
+    "LLMScheduler",
+    "ScheduledChatModel",
+    "get_llm_scheduler",
 ]
@@ -0,0 +1,117 @@
+# TradingAgents/graph/backtest.py
+
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from tradingagents.dataflows.config import use_config
+
+if TYPE_CHECKING:
+    from .trading_graph import TradingAgentsGraph
+
+
+class PipelinedBacktester:
+    """Walks one ticker over consecutive dates with overlapping stages.
+
+    Each date is split into the analyst stage (tool calls and reports) and
+    the decision stage (memory prefetch, debates, trader, risk judge). While
+    date t is in its decision stage, the analyst stages of up to
+    pipeline_depth following dates already run on worker threads.
+
+    Decision stages run one at a time in date order, and reflection on date
+    t happens before the decision stage of date t+1 starts. Since only the
+    decision stage reads memories, every date sees the same memories as a
+    plain propagate loop with reflection after each date.
+
+    With incremental reports, each analyst stage builds on the reports of
+    the date before. Analyst stages then run one at a time in date order and
+    store their reports as soon as they finish, so they still overlap the
+    decision stages but no longer each other.
+    """
+
+    def __init__(self, graph: "TradingAgentsGraph", pipeline_depth: int = 2):
+        """Initialize with the graph to run.
+
+        Args:
+            graph: Graph whose stages, memories and logs are used
+            pipeline_depth: Number of dates whose analyst stage may run ahead
+                of the current decision stage; 0 runs dates strictly in turn
+        """
+        self.graph = graph
+        self.pipeline_depth = max(0, pipeline_depth)
+
+    def _analyst_stage(self, analyst_graph, company_name: str, trade_date) -> Tuple[Dict[str, Any], Dict[str, Any], Any, float]:
+        init_agent_state, args, run_metrics = self.graph._begin_run(
+            company_name, trade_date
+        )
+        start = time.perf_counter()
+        with use_config(self.graph.config):
+            state = analyst_graph.invoke(init_agent_state, **args)
+        if self.graph.report_store is not None:
+            # The next date's analyst stage looks these up
+            self.graph.report_store.save(
+                company_name, trade_date, state, state.get("previous_reports") or {}
+            )
+        return state, args, run_metrics, start
+
+    def run(
+        self,
+        company_name: str,
+        trade_dates: Sequence,
+        returns_fn: Optional[Callable[[Any, Dict[str, Any], str], Optional[float]]] = None,
+    ) -> List[Tuple[Dict[str, Any], str]]:
+        """Run every date and return (final_state, decision) per date.
+
+        Args:
+            company_name: Ticker to trade
+            trade_dates: Dates in the order they are traded
+            returns_fn: Called as returns_fn(trade_date, final_state, decision)
+                after each date; a non-None result is passed to
+                reflect_and_remember before the next decision stage
+
+        Returns:
+            List of (final_state, decision) tuples in date order
+        """
+        self.graph.ticker = company_name
+        # Compiled here, before any worker thread could race to build them
+        analyst_graph = self.graph.get_stage_graph("analysts")
+        decision_graph = self.graph.get_stage_graph("decision")
+        results = []
+        pending = deque()
+
+        # A single worker runs the analyst stages in submission (date) order
+        workers = 1 if self.graph.report_store is not None else max(1, self.pipeline_depth)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for i, trade_date in enumerate(trade_dates):
+                    # Keep the analyst stages of the next dates in flight
+                    while len(pending) <= self.pipeline_depth and i + len(pending) < len(trade_dates):
+                        pending.append(
+                            executor.submit(
+                                self._analyst_stage,
+                                analyst_graph,
+                                company_name,
+                                trade_dates[i + len(pending)],
+                            )
+                        )
+                    state, args, run_metrics, start = pending.popleft().result()
+
+                    with use_config(self.graph.config):
+                        final_state = decision_graph.invoke(state, **args)
+                    final_state, decision = self.graph._finish_run(
+                        trade_date, final_state, run_metrics, start, save_reports=False
+                    )
+                    results.append((final_state, decision))
+
+                    # Reflection barrier
+                    if returns_fn is not None:
+                        returns_losses = returns_fn(trade_date, final_state, decision)
+                        if returns_losses is not None:
+                            self.graph.reflect_and_remember(returns_losses)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        return results
@@ -1,15 +1,84 @@
 # TradingAgents/graph/conditional_logic.py
 
+import math
+import re
+from collections import Counter
+
 from tradingagents.agents.utils.agent_states import AgentState
+from tradingagents.agents.utils.deadline import get_budget
+
+from .signal_processing import extract_decision
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def _latest_arguments(speaker_history: str, prefix: str, n: int = 2):
+    """The speaker's last n arguments, most recent last."""
+    return speaker_history.split(f"\n{prefix}: ")[1:][-n:]
+
+
+def _similarity(a: str, b: str) -> float:
+    """Bag-of-words cosine similarity of two arguments."""
+    ca, cb = Counter(_WORD.findall(a.lower())), Counter(_WORD.findall(b.lower()))
+    dot = sum(count * cb[word] for word, count in ca.items())
+    norm = math.sqrt(sum(v * v for v in ca.values()) * sum(v * v for v in cb.values()))
+    return dot / norm if norm else 0.0
+
+
+def _stance(argument: str, min_confidence: float = 0.75):
+    decision, confidence = extract_decision(argument)
+    return decision if confidence >= min_confidence else None
+
+
+def _converged(histories, threshold: float) -> bool:
+    """Whether a debate round added nothing new.
+
+    histories is a list of (speaker history, speaker prefix). The positions
+    have converged when every speaker ends on the same explicit stance, or
+    when every speaker's last argument largely repeats their previous one.
+    """
+    latest = [_latest_arguments(history, prefix) for history, prefix in histories]
+    if any(not arguments for arguments in latest):
+        return False
+
+    stances = {_stance(arguments[-1]) for arguments in latest}
+    if len(stances) == 1 and None not in stances:
+        return True
+
+    return all(
+        len(arguments) == 2 and _similarity(*arguments) >= threshold
+        for arguments in latest
+    )
 
 
 class ConditionalLogic:
     """Handles conditional logic for determining graph flow."""
 
-    def __init__(self, max_debate_rounds=1, max_risk_discuss_rounds=1):
-        """Initialize with configuration parameters."""
+    def __init__(
+        self,
+        max_debate_rounds=1,
+        max_risk_discuss_rounds=1,
+        early_stop=False,
+        convergence_threshold=0.8,
+        max_debate_turns=None,
+    ):
+        """Initialize with configuration parameters.
+
+        Args:
+            max_debate_rounds: Hard cap on investment debate rounds
+            max_risk_discuss_rounds: Hard cap on risk discussion rounds
+            early_stop: End a debate after any full round in which the
+                positions converged
+            convergence_threshold: Similarity between a speaker's consecutive
+                arguments above which they count as repeating themselves
+            max_debate_turns: Per-run budget of debate turns shared by both
+                debates; each debate still gets its first full round
+        """
         self.max_debate_rounds = max_debate_rounds
         self.max_risk_discuss_rounds = max_risk_discuss_rounds
+        self.early_stop = early_stop
+        self.convergence_threshold = convergence_threshold
+        self.max_debate_turns = max_debate_turns
 
     def should_continue_market(self, state: AgentState):
         """Determine if market analysis should continue."""
@@ -46,20 +115,63 @@ class ConditionalLogic:
     def should_continue_debate(self, state: AgentState) -> str:
         """Determine if debate should continue."""
 
-        if (
-            state["investment_debate_state"]["count"] >= 2 * self.max_debate_rounds
-        ):  # 3 rounds of back-and-forth between 2 agents
+        debate_state = state["investment_debate_state"]
+        count = debate_state["count"]
+        if count >= 2 * self.max_debate_rounds:  # 3 rounds of back-and-forth between 2 agents
             return "Research Manager"
+        # Adaptive stops are only considered once a full round is over
+        if count >= 2 and count % 2 == 0:
+            if self.max_debate_turns is not None and count >= self.max_debate_turns:
+                return "Research Manager"
+            if self.early_stop and _converged(
+                [
+                    (debate_state.get("bull_history", ""), "Bull Analyst"),
+                    (debate_state.get("bear_history", ""), "Bear Analyst"),
+                ],
+                self.convergence_threshold,
+            ):
+                return "Research Manager"
+            budget = get_budget()
+            # Leave time for the research manager, trader and risk judge
+            if budget is not None and not budget.can_afford(2 + 3):
+                budget.skip("Investment debate", "ended early")
+                return "Research Manager"
         if state["investment_debate_state"]["current_response"].startswith("Bull"):
             return "Bear Researcher"
         return "Bull Researcher"
 
+    def should_start_risk_analysis(self, state: AgentState) -> str:
+        """Determine if the risk debate should run before the risk judge."""
+        budget = get_budget()
+        # A round of the three risk analysts plus the judge
+        if budget is not None and not budget.can_afford(3 + 1):
+            budget.skip("Risk debate", "skipped")
+            return "Risk Judge"
+        return "Risky Analyst"
+
     def should_continue_risk_analysis(self, state: AgentState) -> str:
         """Determine if risk analysis should continue."""
-        if (
-            state["risk_debate_state"]["count"] >= 3 * self.max_risk_discuss_rounds
-        ):  # 3 rounds of back-and-forth between 3 agents
+        risk_state = state["risk_debate_state"]
+        count = risk_state["count"]
+        if count >= 3 * self.max_risk_discuss_rounds:  # 3 rounds of back-and-forth between 3 agents
             return "Risk Judge"
+        if count >= 3 and count % 3 == 0:
+            spent = count + state["investment_debate_state"]["count"]
+            if self.max_debate_turns is not None and spent >= self.max_debate_turns:
+                return "Risk Judge"
+            if self.early_stop and _converged(
+                [
+                    (risk_state.get("risky_history", ""), "Risky Analyst"),
+                    (risk_state.get("safe_history", ""), "Safe Analyst"),
+                    (risk_state.get("neutral_history", ""), "Neutral Analyst"),
+                ],
+                self.convergence_threshold,
+            ):
+                return "Risk Judge"
+            budget = get_budget()
+            if budget is not None and not budget.can_afford(3 + 1):
+                budget.skip("Risk debate", "ended early")
+                return "Risk Judge"
         if state["risk_debate_state"]["latest_speaker"].startswith("Risky"):
             return "Safe Analyst"
         if state["risk_debate_state"]["latest_speaker"].startswith("Safe"):
@@ -0,0 +1,98 @@
+# TradingAgents/graph/factory.py
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from tradingagents.default_config import DEFAULT_CONFIG
+
+from .trading_graph import TradingAgentsGraph
+
+
+class GraphFactory:
+    """Caches built TradingAgentsGraph instances for reuse across requests.
+
+    Building a graph creates the LLM clients, memories, tool nodes and node
+    closures and compiles the workflow. The factory does this once per
+    (selected_analysts, config, debug) key and hands out lightweight forks
+    whose run state is private to the caller.
+    """
+
+    def __init__(self, max_size: int = 8):
+        """Initialize with the maximum number of graphs kept alive."""
+        self.max_size = max_size
+        self._graphs: "OrderedDict[str, TradingAgentsGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def _make_key(selected_analysts: List[str], config: Dict[str, Any], debug: bool) -> str:
+        """Serialize everything that affects how a graph is built."""
+        return json.dumps(
+            {"analysts": list(selected_analysts), "config": config, "debug": debug},
+            sort_keys=True,
+            default=repr,
+        )
+
+    def get_graph(
+        self,
+        selected_analysts=["market", "social", "news", "fundamentals"],
+        config: Optional[Dict[str, Any]] = None,
+        debug: bool = False,
+    ) -> TradingAgentsGraph:
+        """Return a request-scoped graph, building and caching it on first use.
+
+        Args:
+            selected_analysts: List of analyst types to include
+            config: Configuration dictionary. If None, uses default config
+            debug: Whether to run in debug mode
+
+        Returns:
+            A fork of the cached graph; its propagate/reflect state is private
+            to the caller while the compiled graph and clients are shared.
+        """
+        config = config or DEFAULT_CONFIG
+        key = self._make_key(selected_analysts, config, debug)
+
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                return graph.fork()
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # Build outside the factory lock so different keys build in parallel,
+        # while concurrent requests for the same key wait for a single build.
+        with build_lock:
+            with self._lock:
+                graph = self._graphs.get(key)
+            if graph is None:
+                graph = TradingAgentsGraph(
+                    selected_analysts, debug=debug, config=dict(config)
+                )
+                with self._lock:
+                    self._graphs[key] = graph
+                    while len(self._graphs) > self.max_size:
+                        evicted, _ = self._graphs.popitem(last=False)
+                        self._build_locks.pop(evicted, None)
+
+        return graph.fork()
+
+    def clear(self):
+        """Drop every cached graph."""
+        with self._lock:
+            self._graphs.clear()
+            self._build_locks.clear()
+
+
+_default_factory = GraphFactory()
+
+
+def get_graph(
+    selected_analysts=["market", "social", "news", "fundamentals"],
+    config: Optional[Dict[str, Any]] = None,
+    debug: bool = False,
+) -> TradingAgentsGraph:
+    """Return a request-scoped graph from the process-wide GraphFactory."""
+    return _default_factory.get_graph(selected_analysts, config, debug)
@@ -0,0 +1,333 @@
+# TradingAgents/graph/instrumentation.py
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+def _output_size(value: Any) -> int:
+    """Approximate size in characters of a node or tool output."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_output_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_output_size(v) for v in value)
+    content = getattr(value, "content", None)
+    if content is not None:
+        return _output_size(content)
+    return len(str(value))
+
+
+def _token_usage(response) -> Dict[str, int]:
+    """Extract prompt/completion token counts from an LLMResult."""
+    prompt_tokens = completion_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+                found = True
+    if not found:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+
+
+class RunMetrics:
+    """Timings and token counts of a single propagate run.
+
+    time_to_first_token is only measured for streamed responses, so it stays
+    None unless llm_streaming (and llm_scheduler) are enabled.
+    """
+
+    def __init__(self, company_name: str, trade_date: str):
+        self.run_id = str(uuid.uuid4())
+        self.company_name = company_name
+        self.trade_date = str(trade_date)
+        self.started_at = time.time()
+        self.wall_time: Optional[float] = None
+        # One entry per node execution, in completion order; started/ended
+        # are seconds since the run started
+        self.nodes: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.tool_calls: List[Dict[str, Any]] = []
+
+    def node_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregate the run's events per node name."""
+        summary: Dict[str, Dict[str, Any]] = {}
+
+        def entry(node):
+            return summary.setdefault(
+                node,
+                {
+                    "executions": 0,
+                    "wall_time": 0.0,
+                    "output_chars": 0,
+                    "llm_calls": 0,
+                    "llm_latency": 0.0,
+                    "time_to_first_token": None,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "tool_calls": 0,
+                    "tool_time": 0.0,
+                    "tool_output_chars": 0,
+                },
+            )
+
+        for node in self.nodes:
+            e = entry(node["node"])
+            e["executions"] += 1
+            e["wall_time"] += node["wall_time"]
+            e["output_chars"] += node["output_chars"]
+        for call in self.llm_calls:
+            e = entry(call["node"])
+            e["llm_calls"] += 1
+            e["llm_latency"] += call["latency"]
+            e["prompt_tokens"] += call["prompt_tokens"]
+            e["completion_tokens"] += call["completion_tokens"]
+            if call["time_to_first_token"] is not None and e["time_to_first_token"] is None:
+                e["time_to_first_token"] = call["time_to_first_token"]
+        for call in self.tool_calls:
+            e = entry(call["node"])
+            e["tool_calls"] += 1
+            e["tool_time"] += call["duration"]
+            e["tool_output_chars"] += call["output_chars"]
+        return summary
+
+    def elapsed(self, nodes) -> float:
+        """Wall-clock time during which any of the given nodes was running.
+
+        Unlike the summed wall_time of node_summary(), nodes that ran in
+        parallel are only counted once.
+        """
+        total = 0.0
+        covered_until = None
+        for started, ended in sorted(
+            (n["started"], n["ended"]) for n in self.nodes if n["node"] in nodes
+        ):
+            if covered_until is None or started > covered_until:
+                total += ended - started
+                covered_until = ended
+            elif ended > covered_until:
+                total += ended - covered_until
+                covered_until = ended
+        return total
+
+    def totals(self) -> Dict[str, Any]:
+        """Whole-run totals."""
+        return {
+            "wall_time": self.wall_time,
+            "llm_calls": len(self.llm_calls),
+            "llm_latency": sum(c["latency"] for c in self.llm_calls),
+            "prompt_tokens": sum(c["prompt_tokens"] for c in self.llm_calls),
+            "completion_tokens": sum(c["completion_tokens"] for c in self.llm_calls),
+            "tool_calls": len(self.tool_calls),
+            "tool_time": sum(c["duration"] for c in self.tool_calls),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "company_of_interest": self.company_name,
+            "trade_date": self.trade_date,
+            "started_at": self.started_at,
+            "totals": self.totals(),
+            "node_summary": self.node_summary(),
+            "nodes": self.nodes,
+            "llm_calls": self.llm_calls,
+            "tool_calls": self.tool_calls,
+        }
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records node, LLM and tool events of one graph run into a RunMetrics.
+
+    Passed as a callback to graph.invoke/stream. Node executions are the
+    direct children of the graph run; LLM and tool events are attributed to
+    the node they ran under by following their parent runs, so calls made
+    inside a node's own subgraph (the lite profile's analyst loops) count
+    for that node. The innermost LangGraph node is kept as "step".
+    """
+
+    def __init__(self, run: RunMetrics):
+        self.run = run
+        self._lock = threading.Lock()
+        self._root_run_id = None
+        self._origin = time.perf_counter()
+        self._started: Dict[Any, Dict[str, Any]] = {}
+        # chain run id -> top-level node it runs under
+        self._node_of: Dict[Any, str] = {}
+
+    def _start(self, run_id, kind, node, name=None, step=None):
+        with self._lock:
+            self._started[run_id] = {
+                "kind": kind,
+                "node": node,
+                "name": name,
+                "step": step,
+                "start": time.perf_counter(),
+                "first_token": None,
+            }
+
+    def _finish(self, run_id):
+        with self._lock:
+            self._node_of.pop(run_id, None)
+            return self._started.pop(run_id, None)
+
+    def _start_call(self, kind, run_id, parent_run_id, metadata, name):
+        step = (metadata or {}).get("langgraph_node")
+        with self._lock:
+            node = self._node_of.get(parent_run_id, step)
+        self._start(run_id, kind, node, name, step)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        if parent_run_id is None:
+            self._root_run_id = run_id
+        elif parent_run_id == self._root_run_id:
+            # Direct children of the graph run are the node executions
+            node = (metadata or {}).get("langgraph_node") or kwargs.get("name")
+            self._start(run_id, "node", node)
+            with self._lock:
+                self._node_of[run_id] = node
+        else:
+            with self._lock:
+                if parent_run_id in self._node_of:
+                    self._node_of[run_id] = self._node_of[parent_run_id]
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        started = self._finish(run_id)
+        if started is None or started["kind"] != "node":
+            return
+        end = time.perf_counter()
+        with self._lock:
+            self.run.nodes.append(
+                {
+                    "node": started["node"],
+                    "wall_time": end - started["start"],
+                    "started": started["start"] - self._origin,
+                    "ended": end - self._origin,
+                    "output_chars": _output_size(outputs),
+                }
+            )
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.on_chain_end(None, run_id=run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self._start_call("llm", run_id, parent_run_id, metadata, (metadata or {}).get("ls_model_name"))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self._start_call("llm", run_id, parent_run_id, metadata, (metadata or {}).get("ls_model_name"))
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            started = self._started.get(run_id)
+            if started is not None and started["first_token"] is None:
+                started["first_token"] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._finish(run_id)
+        if started is None:
+            return
+        end = time.perf_counter()
+        with self._lock:
+            self.run.llm_calls.append(
+                {
+                    "node": started["node"],
+                    "step": started["step"],
+                    "model": started["name"],
+                    "latency": end - started["start"],
+                    "time_to_first_token": (
+                        started["first_token"] - started["start"]
+                        if started["first_token"] is not None
+                        else None
+                    ),
+                    "output_chars": sum(
+                        len(g.text) for gens in response.generations for g in gens
+                    ),
+                    **_token_usage(response),
+                }
+            )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        self._start_call("tool", run_id, parent_run_id, metadata, name)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        started = self._finish(run_id)
+        if started is None:
+            return
+        with self._lock:
+            self.run.tool_calls.append(
+                {
+                    "node": started["node"],
+                    "step": started["step"],
+                    "tool": started["name"],
+                    "duration": time.perf_counter() - started["start"],
+                    "output_chars": _output_size(output),
+                    "error": False,
+                }
+            )
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        started = self._finish(run_id)
+        if started is None:
+            return
+        with self._lock:
+            self.run.tool_calls.append(
+                {
+                    "node": started["node"],
+                    "step": started["step"],
+                    "tool": started["name"],
+                    "duration": time.perf_counter() - started["start"],
+                    "output_chars": 0,
+                    "error": True,
+                }
+            )
+
+
+class MetricsRecorder:
+    """In-process store of per-run metrics, shared by a graph and its forks."""
+
+    def __init__(self, max_runs: int = 100):
+        self._runs: "deque[RunMetrics]" = deque(maxlen=max_runs)
+        self._lock = threading.Lock()
+
+    def start_run(self, company_name: str, trade_date: str):
+        """Create a RunMetrics and the callback handler that fills it."""
+        run = RunMetrics(company_name, trade_date)
+        with self._lock:
+            self._runs.append(run)
+        return run, MetricsCallbackHandler(run)
+
+    @property
+    def runs(self) -> List[RunMetrics]:
+        with self._lock:
+            return list(self._runs)
+
+    def last_run(self) -> Optional[RunMetrics]:
+        with self._lock:
+            return self._runs[-1] if self._runs else None
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [run.to_dict() for run in self.runs]
+
+    def export_json(self, path: str, run: Optional[RunMetrics] = None):
+        """Write one run (or every recorded run) to path as JSON."""
+        data = run.to_dict() if run is not None else self.to_dict()
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
@@ -0,0 +1,394 @@
+# TradingAgents/graph/llm_scheduler.py
+
+import contextvars
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from tradingagents.agents.utils.deadline import DeadlineExceeded, get_budget
+
+# Rate limits are enforced over a sliding window of this many seconds
+WINDOW = 60.0
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Whether error is a provider "429 Too Many Requests" response."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """Whether error is a server error or a dropped connection worth retrying."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status >= 500
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait according to the provider's Retry-After header."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Bucket:
+    """Sliding-window request/token budget of one provider/model."""
+
+    def __init__(self, rpm=None, tpm=None, max_concurrency=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        # [start time, tokens, run] of every request in the window
+        self.window: "deque[list]" = deque()
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.waiters: List[dict] = []
+
+    def prune(self, now: float):
+        while self.window and now - self.window[0][0] >= WINDOW:
+            self.window.popleft()
+
+    def next_waiter(self) -> dict:
+        """The waiter to serve next: the run with the fewest recent requests
+        goes first, arrival order breaks ties."""
+        recent = Counter(entry[2] for entry in self.window)
+        return min(self.waiters, key=lambda w: (recent[w["run"]], w["seq"]))
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until a request of tokens fits the budget (0 if it fits now)."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            # Woken up by a release
+            return WINDOW
+        waits = [0.0]
+        if self.rpm and len(self.window) >= self.rpm:
+            waits.append(self.window[-self.rpm][0] + WINDOW - now)
+        if self.tpm and self.window:
+            # An oversized request is let through once the window is empty
+            excess = sum(entry[1] for entry in self.window) + tokens - self.tpm
+            for start, used, _ in self.window:
+                if excess <= 0:
+                    break
+                excess -= used
+                waits.append(start + WINDOW - now)
+        return max(waits)
+
+
+class LLMScheduler:
+    """Process-wide admission control for LLM requests.
+
+    Requests are grouped per "provider/model" bucket, each with optional
+    requests-per-minute, tokens-per-minute and concurrency limits. Waiting
+    requests are served round-robin across runs so one large batch cannot
+    starve other runs. Rate-limit (429) errors are retried with exponential
+    backoff while pausing the whole bucket; server errors and dropped
+    connections are retried the same way without the pause. The wrapped
+    clients' own retries should be off so attempts don't multiply.
+    max_retries and backoff are defaults, call() and stream() take
+    per-request values.
+    """
+
+    def __init__(self, max_retries: int = 5, backoff: float = 2.0, max_backoff: float = 60.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._limits: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._cond = threading.Condition()
+        self._seq = 0
+
+    def configure(self, limits: Dict[str, Dict[str, Any]]):
+        """Set limits keyed by "provider/model" or "provider".
+
+        Each value may hold "rpm", "tpm" and "max_concurrency"; missing
+        entries are unlimited.
+        """
+        with self._cond:
+            self._limits.update(limits)
+            for key, bucket in self._buckets.items():
+                self._apply_limits(key, bucket)
+            self._cond.notify_all()
+
+    def _apply_limits(self, key: str, bucket: _Bucket):
+        limits = self._limits.get(key) or self._limits.get(key.split("/", 1)[0]) or {}
+        bucket.rpm = limits.get("rpm")
+        bucket.tpm = limits.get("tpm")
+        bucket.max_concurrency = limits.get("max_concurrency")
+
+    def _bucket(self, key: str) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+            self._apply_limits(key, bucket)
+        return bucket
+
+    def acquire(self, key: str, tokens: int, run: str = "default") -> list:
+        """Block until the request fits key's budget; returns a ticket for release()."""
+        with self._cond:
+            bucket = self._bucket(key)
+            self._seq += 1
+            waiter = {"seq": self._seq, "run": run}
+            bucket.waiters.append(waiter)
+            self._cond.notify_all()
+            try:
+                while True:
+                    now = time.monotonic()
+                    bucket.prune(now)
+                    if bucket.next_waiter() is waiter:
+                        delay = bucket.wait_time(tokens, now)
+                        if delay <= 0:
+                            ticket = [now, tokens, run]
+                            bucket.window.append(ticket)
+                            bucket.in_flight += 1
+                            return ticket
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            finally:
+                bucket.waiters.remove(waiter)
+                self._cond.notify_all()
+
+    def release(self, key: str, ticket: list, tokens: Optional[int] = None):
+        """Mark a request finished, correcting its token count if known."""
+        with self._cond:
+            bucket = self._bucket(key)
+            bucket.in_flight -= 1
+            if tokens is not None:
+                ticket[1] = tokens
+            self._cond.notify_all()
+
+    def _pause(self, key: str, seconds: float):
+        with self._cond:
+            bucket = self._bucket(key)
+            bucket.paused_until = max(bucket.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def _retry_delay(self, error: Exception, attempt: int, max_retries: int, backoff: float):
+        """Seconds to wait before retrying after error, None to give up."""
+        if attempt == max_retries or not (
+            _is_rate_limit_error(error) or _is_transient_error(error)
+        ):
+            return None
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(self.max_backoff, backoff * 2**attempt)
+            delay *= 0.5 + random.random() / 2
+        return delay
+
+    def _wait_retry(self, key: str, error: Exception, delay: float):
+        if _is_rate_limit_error(error):
+            # The provider limits the whole bucket, not just this request
+            self._pause(key, delay)
+        else:
+            time.sleep(delay)
+
+    def call(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        tokens: int,
+        run: str = "default",
+        count_tokens: Optional[Callable[[Any], Optional[int]]] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+    ):
+        """Run fn under key's budget, retrying rate-limit and transient errors
+        with backoff."""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        backoff = self.backoff if backoff is None else backoff
+        for attempt in range(max_retries + 1):
+            ticket = self.acquire(key, tokens, run)
+            try:
+                result = fn()
+            except Exception as e:
+                self.release(key, ticket)
+                delay = self._retry_delay(e, attempt, max_retries, backoff)
+                if delay is None:
+                    raise
+                self._wait_retry(key, e, delay)
+                continue
+            self.release(key, ticket, count_tokens(result) if count_tokens else None)
+            return result
+
+    def stream(
+        self,
+        key: str,
+        fn: Callable[[], Iterator[Any]],
+        tokens: int,
+        run: str = "default",
+        count_tokens: Optional[Callable[[List[Any]], Optional[int]]] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+    ) -> Iterator[Any]:
+        """Like call() for a streaming fn; errors are retried only until the
+        first chunk has been yielded."""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        backoff = self.backoff if backoff is None else backoff
+        for attempt in range(max_retries + 1):
+            ticket = self.acquire(key, tokens, run)
+            chunks = []
+            used = None
+            try:
+                for chunk in fn():
+                    chunks.append(chunk)
+                    yield chunk
+                used = count_tokens(chunks) if count_tokens else None
+            except Exception as e:
+                delay = None if chunks else self._retry_delay(e, attempt, max_retries, backoff)
+                if delay is None:
+                    raise
+                error = e
+            else:
+                return
+            finally:
+                self.release(key, ticket, used)
+            self._wait_retry(key, error, delay)
+
+
+_default_scheduler = LLMScheduler()
+
+# Runs calls that have a deadline, so the caller can stop waiting for them.
+# A call given up on keeps its worker until the provider answers.
+_timed_calls: Optional[ThreadPoolExecutor] = None
+_timed_calls_lock = threading.Lock()
+
+
+def _timed_call_executor() -> ThreadPoolExecutor:
+    global _timed_calls
+    with _timed_calls_lock:
+        if _timed_calls is None:
+            _timed_calls = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-timed-call")
+        return _timed_calls
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Return the scheduler shared by every graph in the process."""
+    return _default_scheduler
+
+
+class ScheduledChatModel(BaseChatModel):
+    """Chat model wrapper that routes every request through an LLMScheduler.
+
+    Tools bound with bind_tools() and batch() calls go through the wrapper
+    too, so agents can use it exactly like the wrapped model. In a run with
+    a deadline, each call raises DeadlineExceeded once it outlasts the
+    remaining budget. With streaming=True, invoke() streams from the wrapped
+    model, so callbacks see every token (e.g. for time to first token);
+    streamed calls check the deadline per chunk instead of timing out.
+    """
+
+    llm: BaseChatModel
+    scheduler: Any
+    key: str
+    streaming: bool = False
+    # Retry settings of this model's requests, None for the scheduler's
+    max_retries: Optional[int] = None
+    backoff: Optional[float] = None
+    # Completion tokens reserved per request until the real usage is known
+    expected_output_tokens: int = 1000
+
+    @property
+    def _llm_type(self) -> str:
+        return self.llm._llm_type
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.llm._identifying_params
+
+    def _get_ls_params(self, stop=None, **kwargs):
+        return self.llm._get_ls_params(stop=stop, **kwargs)
+
+    def bind_tools(self, tools, **kwargs):
+        # Let the wrapped model format the tools for its provider
+        return self.bind(**self.llm.bind_tools(tools, **kwargs).kwargs)
+
+    def _estimate_tokens(self, messages) -> int:
+        return sum(len(str(m.content)) for m in messages) // 4 + self.expected_output_tokens
+
+    @staticmethod
+    def _count_tokens(result: ChatResult) -> Optional[int]:
+        total = 0
+        for generation in result.generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if not usage:
+                usage = (result.llm_output or {}).get("token_usage")
+                return usage.get("total_tokens") if usage else None
+            total += usage.get("total_tokens", 0)
+        return total
+
+    @staticmethod
+    def _count_stream_tokens(chunks: List[ChatGenerationChunk]) -> Optional[int]:
+        usages = [c.message.usage_metadata for c in chunks if getattr(c.message, "usage_metadata", None)]
+        return sum(u.get("total_tokens", 0) for u in usages) if usages else None
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        run = ((run_manager.metadata if run_manager else None) or {}).get("run_id", "default")
+        budget = get_budget()
+
+        def stream():
+            if budget is not None and budget.expired():
+                raise DeadlineExceeded(f"{self.key}: run deadline passed")
+            # The caller reports each chunk to run_manager, the wrapped model
+            # must not report it a second time
+            return self.llm._stream(messages, stop=stop, **kwargs)
+
+        for chunk in self.scheduler.stream(
+            self.key,
+            stream,
+            self._estimate_tokens(messages),
+            run,
+            self._count_stream_tokens,
+            max_retries=self.max_retries,
+            backoff=self.backoff,
+        ):
+            yield chunk
+            if budget is not None and budget.expired():
+                raise DeadlineExceeded(f"{self.key}: run deadline passed while streaming")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        run = ((run_manager.metadata if run_manager else None) or {}).get("run_id", "default")
+        budget = get_budget()
+
+        def generate():
+            # Retries after the deadline would be wasted
+            if budget is not None and budget.expired():
+                raise DeadlineExceeded(f"{self.key}: run deadline passed")
+            return self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        def call():
+            return self.scheduler.call(
+                self.key,
+                generate,
+                self._estimate_tokens(messages),
+                run,
+                self._count_tokens,
+                max_retries=self.max_retries,
+                backoff=self.backoff,
+            )
+
+        if budget is None:
+            return call()
+        # Stop waiting once the run is out of time; the request itself
+        # finishes in the background and releases its scheduler slot
+        future = _timed_call_executor().submit(contextvars.copy_context().run, call)
+        timeout = budget.call_timeout()
+        try:
+            return future.result(timeout=timeout)
+        except FuturesTimeout:
+            raise DeadlineExceeded(f"{self.key}: no response within {timeout:.1f}s") from None
@@ -1,6 +1,6 @@
 # TradingAgents/graph/propagation.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from tradingagents.agents.utils.agent_states import (
     AgentState,
     InvestDebateState,
@@ -39,11 +39,23 @@ class Propagator:
             "fundamentals_report": "",
             "sentiment_report": "",
             "news_report": "",
+            "report_digest": {},
+            "deadline_report": {},
+            "previous_reports": {},
+            "past_memories": {},
         }
 
-    def get_graph_args(self) -> Dict[str, Any]:
+    def get_graph_args(
+        self, callbacks: Optional[List[Any]] = None, run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get arguments for the graph invocation."""
+        config = {"recursion_limit": self.max_recur_limit}
+        if callbacks:
+            config["callbacks"] = callbacks
+        if run_id:
+            # Inherited by every LLM call of the run, e.g. for fair scheduling
+            config["metadata"] = {"run_id": run_id}
         return {
             "stream_mode": "values",
-            "config": {"recursion_limit": self.max_recur_limit},
+            "config": config,
         }
@@ -1,13 +1,15 @@
 # TradingAgents/graph/reflection.py
 
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from typing import Dict, Any, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 
 class Reflector:
     """Handles reflection on decisions and updating memory."""
 
-    def __init__(self, quick_thinking_llm: ChatOpenAI):
+    def __init__(self, quick_thinking_llm: "ChatOpenAI"):
         """Initialize the reflector with an LLM."""
         self.quick_thinking_llm = quick_thinking_llm
         self.reflection_system_prompt = self._get_reflection_prompt()
@@ -55,11 +57,11 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
 
         return f"{curr_market_report}\n\n{curr_sentiment_report}\n\n{curr_news_report}\n\n{curr_fundamentals_report}"
 
-    def _reflect_on_component(
-        self, component_type: str, report: str, situation: str, returns_losses
-    ) -> str:
-        """Generate reflection for a component."""
-        messages = [
+    def _get_reflection_messages(
+        self, report: str, situation: str, returns_losses
+    ) -> List[Tuple[str, str]]:
+        """Build the reflection prompt for a component."""
+        return [
             ("system", self.reflection_system_prompt),
             (
                 "human",
@@ -67,9 +69,83 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
             ),
         ]
 
+    def _get_component_reports(self, current_state: Dict[str, Any]) -> Dict[str, str]:
+        """Map each memory-backed component to the output it produced."""
+        return {
+            "bull": current_state["investment_debate_state"]["bull_history"],
+            "bear": current_state["investment_debate_state"]["bear_history"],
+            "trader": current_state["trader_investment_plan"],
+            "invest_judge": current_state["investment_debate_state"]["judge_decision"],
+            "risk_manager": current_state["risk_debate_state"]["judge_decision"],
+        }
+
+    def _reflect_on_component(
+        self, component_type: str, report: str, situation: str, returns_losses
+    ) -> str:
+        """Generate reflection for a component."""
+        messages = self._get_reflection_messages(report, situation, returns_losses)
+
         result = self.quick_thinking_llm.invoke(messages).content
         return result
 
+    def reflect_all(
+        self,
+        current_state: Dict[str, Any],
+        returns_losses,
+        memories: Dict[str, Any],
+        max_concurrency: int = 5,
+    ):
+        """Reflect on every component concurrently and update their memories.
+
+        Args:
+            current_state: Final state of a propagate run
+            returns_losses: Realized returns for the decision
+            memories: Mapping of component name ("bull", "bear", "trader",
+                "invest_judge", "risk_manager") to its memory
+            max_concurrency: Maximum number of reflection LLM calls in flight
+        """
+        self.reflect_many([(current_state, returns_losses)], memories, max_concurrency)
+
+    def reflect_many(
+        self,
+        states_and_returns: List[Tuple[Dict[str, Any], Any]],
+        memories: Dict[str, Any],
+        max_concurrency: int = 5,
+    ):
+        """Reflect on many (state, returns) pairs at once, e.g. after a backtest.
+
+        All reflection calls share one concurrency limit, and each memory
+        receives its new lessons in a single add_situations call. Components
+        that produced no output in a run are not reflected on.
+        """
+        jobs = []
+        for current_state, returns_losses in states_and_returns:
+            situation = self._extract_current_situation(current_state)
+            reports = self._get_component_reports(current_state)
+            for component, memory in memories.items():
+                # e.g. the debate histories of a run that skipped the debate
+                if not reports[component]:
+                    continue
+                jobs.append((component, situation, reports[component], returns_losses))
+
+        if not jobs:
+            return
+
+        results = self.quick_thinking_llm.batch(
+            [
+                self._get_reflection_messages(report, situation, returns_losses)
+                for _, situation, report, returns_losses in jobs
+            ],
+            config={"max_concurrency": max_concurrency},
+        )
+
+        lessons: Dict[str, List[Tuple[str, str]]] = {}
+        for (component, situation, _, _), result in zip(jobs, results):
+            lessons.setdefault(component, []).append((situation, result.content))
+
+        for component, situations_and_advice in lessons.items():
+            memories[component].add_situations(situations_and_advice)
+
     def reflect_bull_researcher(self, current_state, returns_losses, bull_memory):
         """Reflect on bull researcher's analysis and update memory."""
         situation = self._extract_current_situation(current_state)
@@ -1,32 +1,40 @@
 # TradingAgents/graph/setup.py
 
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from typing import Dict, Any, TYPE_CHECKING
 from langgraph.graph import END, StateGraph, START
+from langchain_core.runnables import Runnable
 from langgraph.prebuilt import ToolNode
 
 from tradingagents.agents import *
 from tradingagents.agents.utils.agent_states import AgentState
 from tradingagents.agents.utils.agent_utils import Toolkit
+from tradingagents.agents.utils.report_store import REPORT_FIELDS
 
 from .conditional_logic import ConditionalLogic
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
 
 class GraphSetup:
     """Handles the setup and configuration of the agent graph."""
 
     def __init__(
         self,
-        quick_thinking_llm: ChatOpenAI,
-        deep_thinking_llm: ChatOpenAI,
+        quick_thinking_llm: "ChatOpenAI",
+        deep_thinking_llm: "ChatOpenAI",
         toolkit: Toolkit,
-        tool_nodes: Dict[str, ToolNode],
+        tool_nodes: Dict[str, Runnable],
         bull_memory,
         bear_memory,
         trader_memory,
         invest_judge_memory,
         risk_manager_memory,
         conditional_logic: ConditionalLogic,
+        memory_hub: MemoryHub = None,
+        analyst_tool_llms: Dict[str, Any] = None,
+        report_digest: Dict[str, Any] = None,
+        compact_tool_results: int = None,
     ):
         """Initialize with required components."""
         self.quick_thinking_llm = quick_thinking_llm
@@ -39,73 +47,131 @@ class GraphSetup:
         self.invest_judge_memory = invest_judge_memory
         self.risk_manager_memory = risk_manager_memory
         self.conditional_logic = conditional_logic
+        self.memory_hub = memory_hub
+        # Analyst type -> model for tool-selection turns
+        self.analyst_tool_llms = analyst_tool_llms or {}
+        # {"max_tokens": ..., "full_text": [...]} to add the digest stage
+        self.report_digest = report_digest
+        # Characters answered tool results are shortened to, None to keep them
+        self.compact_tool_results = compact_tool_results
 
-    def setup_graph(
-        self, selected_analysts=["market", "social", "news", "fundamentals"]
-    ):
-        """Set up and compile the agent workflow graph.
-
-        Args:
-            selected_analysts (list): List of analyst types to include. Options are:
-                - "market": Market analyst
-                - "social": Social media analyst
-                - "news": News analyst
-                - "fundamentals": Fundamentals analyst
-        """
-        if len(selected_analysts) == 0:
-            raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
-
-        # Create analyst nodes
+    def _create_analysts(self, selected_analysts):
+        """Analyst, message-clearing and tool nodes per selected analyst type."""
         analyst_nodes = {}
         delete_nodes = {}
         tool_nodes = {}
 
         if "market" in selected_analysts:
             analyst_nodes["market"] = create_market_analyst(
-                self.quick_thinking_llm, self.toolkit
+                self.quick_thinking_llm,
+                self.toolkit,
+                self.analyst_tool_llms.get("market"),
+                self.compact_tool_results,
             )
             delete_nodes["market"] = create_msg_delete()
             tool_nodes["market"] = self.tool_nodes["market"]
 
         if "social" in selected_analysts:
             analyst_nodes["social"] = create_social_media_analyst(
-                self.quick_thinking_llm, self.toolkit
+                self.quick_thinking_llm,
+                self.toolkit,
+                self.analyst_tool_llms.get("social"),
+                self.compact_tool_results,
             )
             delete_nodes["social"] = create_msg_delete()
             tool_nodes["social"] = self.tool_nodes["social"]
 
         if "news" in selected_analysts:
             analyst_nodes["news"] = create_news_analyst(
-                self.quick_thinking_llm, self.toolkit
+                self.quick_thinking_llm,
+                self.toolkit,
+                self.analyst_tool_llms.get("news"),
+                self.compact_tool_results,
             )
             delete_nodes["news"] = create_msg_delete()
             tool_nodes["news"] = self.tool_nodes["news"]
 
         if "fundamentals" in selected_analysts:
             analyst_nodes["fundamentals"] = create_fundamentals_analyst(
-                self.quick_thinking_llm, self.toolkit
+                self.quick_thinking_llm,
+                self.toolkit,
+                self.analyst_tool_llms.get("fundamentals"),
+                self.compact_tool_results,
             )
             delete_nodes["fundamentals"] = create_msg_delete()
             tool_nodes["fundamentals"] = self.tool_nodes["fundamentals"]
 
+        return analyst_nodes, delete_nodes, tool_nodes
+
+    def setup_graph(
+        self,
+        selected_analysts=["market", "social", "news", "fundamentals"],
+        stage="full",
+        profile="full",
+    ):
+        """Set up and compile the agent workflow graph.
+
+        Args:
+            selected_analysts (list): List of analyst types to include. Options are:
+                - "market": Market analyst
+                - "social": Social media analyst
+                - "news": News analyst
+                - "fundamentals": Fundamentals analyst
+            stage (str): Part of the workflow to compile:
+                - "full": analysts through the risk judge
+                - "analysts": only the analyst team, ending with the reports
+                - "decision": memory prefetch through the risk judge, starting
+                  from a state that already has the analyst reports
+            profile (str): Topology of the workflow:
+                - "full": analysts in sequence, bull/bear debate, research
+                  manager, trader, risk debate and risk judge
+                - "lite": analysts in parallel, one combined researcher/trader
+                  call and the risk judge, writing the same state fields.
+                  It has no debaters, so report_digest is ignored.
+        """
+        if stage not in ("full", "analysts", "decision"):
+            raise ValueError(f"Trading Agents Graph Setup Error: unknown stage {stage}")
+        if profile not in ("full", "lite"):
+            raise ValueError(f"Trading Agents Graph Setup Error: unknown profile {profile}")
+        with_analysts = stage in ("full", "analysts")
+        with_decision = stage in ("full", "decision")
+        if with_analysts and len(selected_analysts) == 0:
+            raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
+        if not with_analysts:
+            selected_analysts = []
+        if profile == "lite":
+            return self._setup_lite_graph(selected_analysts, with_decision)
+
+        analyst_nodes, delete_nodes, tool_nodes = self._create_analysts(
+            selected_analysts
+        )
+
+        # Nodes that read the digest instead of the full reports
+        full_text = self.report_digest["full_text"] if self.report_digest else []
+        digest = {
+            node: self.report_digest is not None and node not in full_text
+            for node in ("bull", "bear", "risky", "safe", "neutral")
+        }
+
         # Create researcher and manager nodes
         bull_researcher_node = create_bull_researcher(
-            self.quick_thinking_llm, self.bull_memory
+            self.quick_thinking_llm, self.bull_memory, digest["bull"]
         )
         bear_researcher_node = create_bear_researcher(
-            self.quick_thinking_llm, self.bear_memory
+            self.quick_thinking_llm, self.bear_memory, digest["bear"]
         )
+        # The judges fall back to the quick model under a tight deadline
         research_manager_node = create_research_manager(
-            self.deep_thinking_llm, self.invest_judge_memory
+            self.deep_thinking_llm, self.invest_judge_memory, self.quick_thinking_llm
         )
         trader_node = create_trader(self.quick_thinking_llm, self.trader_memory)
 
         # Create risk analysis nodes
-        risky_analyst = create_risky_debator(self.quick_thinking_llm)
-        neutral_analyst = create_neutral_debator(self.quick_thinking_llm)
-        safe_analyst = create_safe_debator(self.quick_thinking_llm)
+        risky_analyst = create_risky_debator(self.quick_thinking_llm, digest["risky"])
+        neutral_analyst = create_neutral_debator(self.quick_thinking_llm, digest["neutral"])
+        safe_analyst = create_safe_debator(self.quick_thinking_llm, digest["safe"])
         risk_manager_node = create_risk_manager(
-            self.deep_thinking_llm, self.risk_manager_memory
+            self.deep_thinking_llm, self.risk_manager_memory, self.quick_thinking_llm
         )
 
         # Create workflow
@@ -119,20 +185,29 @@ class GraphSetup:
             )
             workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
 
-        # Add other nodes
-        workflow.add_node("Bull Researcher", bull_researcher_node)
-        workflow.add_node("Bear Researcher", bear_researcher_node)
-        workflow.add_node("Research Manager", research_manager_node)
-        workflow.add_node("Trader", trader_node)
-        workflow.add_node("Risky Analyst", risky_analyst)
-        workflow.add_node("Neutral Analyst", neutral_analyst)
-        workflow.add_node("Safe Analyst", safe_analyst)
-        workflow.add_node("Risk Judge", risk_manager_node)
+        # The decision stage starts here, after the last analyst
+        decision_entry = (
+            "Memory Prefetch" if self.memory_hub is not None else "Bull Researcher"
+        )
+        # The digest is the last step of the analyst stage
+        analysts_exit = decision_entry if with_decision else END
+        if with_analysts and self.report_digest is not None:
+            workflow.add_node(
+                "Report Digest",
+                create_report_digest(
+                    self.quick_thinking_llm, self.report_digest["max_tokens"]
+                ),
+            )
+            workflow.add_edge("Report Digest", analysts_exit)
+            analysts_exit = "Report Digest"
 
         # Define edges
-        # Start with the first analyst
-        first_analyst = selected_analysts[0]
-        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
+        if with_analysts:
+            # Start with the first analyst
+            first_analyst = selected_analysts[0]
+            workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
+        else:
+            workflow.add_edge(START, decision_entry)
 
         # Connect analysts in sequence
         for i, analyst_type in enumerate(selected_analysts):
@@ -148,12 +223,32 @@ class GraphSetup:
             )
             workflow.add_edge(current_tools, current_analyst)
 
-            # Connect to next analyst or to Bull Researcher if this is the last analyst
+            # Connect to next analyst or to the decision stage if this is the last analyst
             if i < len(selected_analysts) - 1:
                 next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
                 workflow.add_edge(current_clear, next_analyst)
             else:
-                workflow.add_edge(current_clear, "Bull Researcher")
+                workflow.add_edge(current_clear, analysts_exit)
+
+        if not with_decision:
+            return workflow.compile()
+
+        # Add decision nodes
+        if self.memory_hub is not None:
+            workflow.add_node(
+                "Memory Prefetch", create_memory_prefetch(self.memory_hub)
+            )
+        workflow.add_node("Bull Researcher", bull_researcher_node)
+        workflow.add_node("Bear Researcher", bear_researcher_node)
+        workflow.add_node("Research Manager", research_manager_node)
+        workflow.add_node("Trader", trader_node)
+        workflow.add_node("Risky Analyst", risky_analyst)
+        workflow.add_node("Neutral Analyst", neutral_analyst)
+        workflow.add_node("Safe Analyst", safe_analyst)
+        workflow.add_node("Risk Judge", risk_manager_node)
+
+        if self.memory_hub is not None:
+            workflow.add_edge("Memory Prefetch", "Bull Researcher")
 
         # Add remaining edges
         workflow.add_conditional_edges(
@@ -173,7 +268,14 @@ class GraphSetup:
             },
         )
         workflow.add_edge("Research Manager", "Trader")
-        workflow.add_edge("Trader", "Risky Analyst")
+        workflow.add_conditional_edges(
+            "Trader",
+            self.conditional_logic.should_start_risk_analysis,
+            {
+                "Risky Analyst": "Risky Analyst",
+                "Risk Judge": "Risk Judge",
+            },
+        )
         workflow.add_conditional_edges(
             "Risky Analyst",
             self.conditional_logic.should_continue_risk_analysis,
@@ -203,3 +305,84 @@ class GraphSetup:
 
         # Compile and return
         return workflow.compile()
+
+    def _analyst_loop(self, analyst_type, analyst_node, tool_node):
+        """Node running one analyst's tool loop on its own message history.
+
+        Lets analysts run in parallel without interleaving their tool calls
+        in the shared messages channel; only the report is written back.
+        """
+        name = f"{analyst_type.capitalize()} Analyst"
+        loop = StateGraph(AgentState)
+        loop.add_node(name, analyst_node)
+        loop.add_node(f"tools_{analyst_type}", tool_node)
+        loop.add_edge(START, name)
+        loop.add_conditional_edges(
+            name,
+            getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+            {
+                f"tools_{analyst_type}": f"tools_{analyst_type}",
+                f"Msg Clear {analyst_type.capitalize()}": END,
+            },
+        )
+        loop.add_edge(f"tools_{analyst_type}", name)
+        loop = loop.compile()
+        field = REPORT_FIELDS[analyst_type]
+
+        def run_analyst(state, config):
+            final_state = loop.invoke(
+                {**state, "messages": [("human", state["company_of_interest"])]},
+                config,
+            )
+            return {field: final_state[field]}
+
+        return run_analyst
+
+    def _setup_lite_graph(self, selected_analysts, with_decision):
+        """Compile the "lite" profile, see setup_graph.
+
+        The research trader reads the full reports, so there is no Report
+        Digest node whatever report_digest says.
+        """
+        analyst_nodes, _, tool_nodes = self._create_analysts(selected_analysts)
+
+        workflow = StateGraph(AgentState)
+
+        analysts = []
+        for analyst_type, node in analyst_nodes.items():
+            name = f"{analyst_type.capitalize()} Analyst"
+            workflow.add_node(
+                name, self._analyst_loop(analyst_type, node, tool_nodes[analyst_type])
+            )
+            workflow.add_edge(START, name)
+            analysts.append(name)
+
+        if not with_decision:
+            workflow.add_edge(analysts, END)
+            return workflow.compile()
+
+        decision_entry = (
+            "Memory Prefetch" if self.memory_hub is not None else "Research Trader"
+        )
+        if self.memory_hub is not None:
+            workflow.add_node(
+                "Memory Prefetch", create_memory_prefetch(self.memory_hub)
+            )
+            workflow.add_edge("Memory Prefetch", "Research Trader")
+        workflow.add_node(
+            "Research Trader",
+            create_research_trader(self.quick_thinking_llm, self.trader_memory),
+        )
+        workflow.add_node(
+            "Risk Judge",
+            create_risk_manager(
+                self.deep_thinking_llm, self.risk_manager_memory, self.quick_thinking_llm
+            ),
+        )
+
+        # Wait for every analyst before deciding
+        workflow.add_edge(analysts or START, decision_entry)
+        workflow.add_edge("Research Trader", "Risk Judge")
+        workflow.add_edge("Risk Judge", END)
+
+        return workflow.compile()
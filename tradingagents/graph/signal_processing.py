@@ -1,14 +1,95 @@
 # TradingAgents/graph/signal_processing.py
 
-from langchain_openai import ChatOpenAI
+import re
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+DECISIONS = ("BUY", "SELL", "HOLD")
+
+# The keyword must be a whole word followed by punctuation, closing markup,
+# a spaced dash or the end of the line, so "Hold off", "Sell-side" and the
+# "BUY/HOLD/SELL" template text from the prompts don't count as decisions.
+_END = r"\b(?=[*_`\"')\].,;:!?]|\s+[-\u2013\u2014(]|[ \t]*$)"
+
+# Ordered from most to least explicit. Each entry is (pattern, confidence).
+_DECISION_PATTERNS = [
+    (
+        re.compile(
+            r"FINAL\s+TRANSACTION\s+PROPOSAL\s*:?\s*[*_`\"']*\s*(BUY|SELL|HOLD)" + _END,
+            re.IGNORECASE | re.MULTILINE,
+        ),
+        1.0,
+    ),
+    (
+        re.compile(
+            r"(?:FINAL\s+)?(?:RECOMMENDATION|DECISION|VERDICT)\s*[*_]*\s*[:\-]\s*[*_`\"']*\s*(BUY|SELL|HOLD)" + _END,
+            re.IGNORECASE | re.MULTILINE,
+        ),
+        0.9,
+    ),
+    (
+        re.compile(r"\*\*\s*(BUY|SELL|HOLD)\s*\*\*", re.IGNORECASE),
+        0.8,
+    ),
+]
+# Not next to a "/" on either side, which is the "BUY/HOLD/SELL" template
+_BARE_DECISION = re.compile(r"(?<!/)\b(BUY|SELL|HOLD)\b(?!\s*/)")
+
+
+def extract_decision(full_signal: str) -> Tuple[Optional[str], float]:
+    """
+    Extract the decision from a trading signal without calling the LLM.
+
+    Args:
+        full_signal: Complete trading signal text
+
+    Returns:
+        Tuple of (decision, confidence). The decision is None when no rule
+        matched unambiguously; confidence is in [0, 1].
+    """
+    if not full_signal:
+        return None, 0.0
+
+    for pattern, confidence in _DECISION_PATTERNS:
+        matches = [m.upper() for m in pattern.findall(full_signal)]
+        if not matches:
+            continue
+        # The closing statement wins, but disagreeing mentions halve the
+        # confidence, below any sensible min_confidence: the text may be
+        # quoting other agents, so the LLM should decide.
+        decision = matches[-1]
+        if len(set(matches)) > 1:
+            confidence *= 0.5
+        return decision, confidence
+
+    # Upper-case bare mentions only, lower-case "buy"/"hold" are too common
+    # in ordinary prose to mean anything.
+    mentions = set(_BARE_DECISION.findall(full_signal))
+    if len(mentions) == 1:
+        return mentions.pop(), 0.6
+    return None, 0.0
 
 
 class SignalProcessor:
     """Processes trading signals to extract actionable decisions."""
 
-    def __init__(self, quick_thinking_llm: ChatOpenAI):
-        """Initialize with an LLM for processing."""
+    def __init__(self, quick_thinking_llm: "ChatOpenAI", min_confidence: float = 0.75):
+        """Initialize with an LLM for processing.
+
+        Args:
+            quick_thinking_llm: LLM used when the rule-based extractor is unsure
+            min_confidence: Minimum rule-based confidence accepted without
+                falling back to the LLM
+        """
         self.quick_thinking_llm = quick_thinking_llm
+        self.min_confidence = min_confidence
+
+    def extract_decision(self, full_signal: str) -> Tuple[Optional[str], float]:
+        """Extract the decision without calling the LLM, see extract_decision()."""
+        return extract_decision(full_signal)
 
     def process_signal(self, full_signal: str) -> str:
         """
@@ -20,7 +101,49 @@ class SignalProcessor:
         Returns:
             Extracted decision (BUY, SELL, or HOLD)
         """
-        messages = [
+        decision, confidence = self.extract_decision(full_signal)
+        if decision is not None and confidence >= self.min_confidence:
+            return decision
+
+        return self._normalize(
+            self.quick_thinking_llm.invoke(self._get_messages(full_signal)).content
+        )
+
+    def process_signals(self, full_signals: List[str]) -> List[str]:
+        """
+        Process many trading signals, e.g. to re-score archived decisions.
+
+        Signals the rule-based extractor is confident about never reach the
+        LLM; the remaining ones are sent as a single batch.
+
+        Args:
+            full_signals: List of complete trading signal texts
+
+        Returns:
+            List of extracted decisions, in the same order as the input
+        """
+        decisions: List[Optional[str]] = []
+        pending = []
+        for i, full_signal in enumerate(full_signals):
+            decision, confidence = self.extract_decision(full_signal)
+            if decision is not None and confidence >= self.min_confidence:
+                decisions.append(decision)
+            else:
+                decisions.append(None)
+                pending.append(i)
+
+        if pending:
+            responses = self.quick_thinking_llm.batch(
+                [self._get_messages(full_signals[i]) for i in pending]
+            )
+            for i, response in zip(pending, responses):
+                decisions[i] = self._normalize(response.content)
+
+        return decisions
+
+    def _get_messages(self, full_signal: str):
+        """Build the LLM fallback prompt."""
+        return [
             (
                 "system",
                 "You are an efficient assistant designed to analyze paragraphs or financial reports provided by a group of analysts. Your task is to extract the investment decision: SELL, BUY, or HOLD. Provide only the extracted decision (SELL, BUY, or HOLD) as your output, without adding any additional text or information.",
@@ -28,4 +151,7 @@ class SignalProcessor:
             ("human", full_signal),
         ]
 
-        return self.quick_thinking_llm.invoke(messages).content
+    def _normalize(self, content: str) -> str:
+        """Reduce an LLM answer to a bare decision where possible."""
+        found = _BARE_DECISION.findall(content.upper())
+        return found[-1] if found else content.strip()
@@ -1,32 +1,42 @@
 # TradingAgents/graph/trading_graph.py
 
+import copy
 import os
+import time
+import uuid
 from pathlib import Path
 import json
 from datetime import date
 from typing import Dict, Any, Tuple, List, Optional
 
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
-
+from langchain_core.runnables import Runnable
 from langgraph.prebuilt import ToolNode
 
 from tradingagents.agents import *
 from tradingagents.default_config import DEFAULT_CONFIG
 from tradingagents.agents.utils.memory import FinancialSituationMemory
+from tradingagents.agents.utils.report_store import REPORT_FIELDS, ReportStore
+from tradingagents.agents.utils.deadline import (
+    DECISION_CALLS,
+    BudgetCallbackHandler,
+    DeadlineExceeded,
+    RunBudget,
+    use_budget,
+)
 from tradingagents.agents.utils.agent_states import (
     AgentState,
     InvestDebateState,
     RiskDebateState,
 )
-from tradingagents.dataflows.interface import set_config
+from tradingagents.dataflows.config import use_config
 
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .instrumentation import MetricsRecorder
+from .llm_scheduler import ScheduledChatModel, get_llm_scheduler
 
 
 class TradingAgentsGraph:
@@ -48,9 +58,6 @@ class TradingAgentsGraph:
         self.debug = debug
         self.config = config or DEFAULT_CONFIG
 
-        # Update the interface's config
-        set_config(self.config)
-
         # Create necessary directories
         os.makedirs(
             os.path.join(self.config["project_dir"], "dataflows/data_cache"),
@@ -58,18 +65,13 @@ class TradingAgentsGraph:
         )
 
         # Initialize LLMs
-        if self.config["llm_provider"].lower() == "openai" or self.config["llm_provider"] == "ollama" or self.config["llm_provider"] == "openrouter":
-            self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
-            self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
-        elif self.config["llm_provider"].lower() == "anthropic":
-            self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
-            self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
-        elif self.config["llm_provider"].lower() == "google":
-            self.deep_thinking_llm = ChatGoogleGenerativeAI(model=self.config["deep_think_llm"])
-            self.quick_thinking_llm = ChatGoogleGenerativeAI(model=self.config["quick_think_llm"])
-        else:
-            raise ValueError(f"Unsupported LLM provider: {self.config['llm_provider']}")
-        
+        self.deep_thinking_llm = self._schedule_llm(
+            self._create_llm(self.config["deep_think_llm"]), self.config["deep_think_llm"]
+        )
+        self.quick_thinking_llm = self._schedule_llm(
+            self._create_llm(self.config["quick_think_llm"]), self.config["quick_think_llm"]
+        )
+
         self.toolkit = Toolkit(config=self.config)
 
         # Initialize memories
@@ -79,11 +81,24 @@ class TradingAgentsGraph:
         self.invest_judge_memory = FinancialSituationMemory("invest_judge_memory", self.config)
         self.risk_manager_memory = FinancialSituationMemory("risk_manager_memory", self.config)
 
+        # One embedding and one vectorized search serve all five memories
+        self.memory_hub = (
+            MemoryHub(self._get_memories())
+            if self.config.get("prefetch_memories", True)
+            else None
+        )
+
         # Create tool nodes
         self.tool_nodes = self._create_tool_nodes()
 
         # Initialize components
-        self.conditional_logic = ConditionalLogic()
+        self.conditional_logic = ConditionalLogic(
+            max_debate_rounds=self.config["max_debate_rounds"],
+            max_risk_discuss_rounds=self.config["max_risk_discuss_rounds"],
+            early_stop=self.config.get("debate_early_stop", False),
+            convergence_threshold=self.config.get("debate_convergence_threshold", 0.8),
+            max_debate_turns=self.config.get("max_debate_turns"),
+        )
         self.graph_setup = GraphSetup(
             self.quick_thinking_llm,
             self.deep_thinking_llm,
@@ -95,11 +110,40 @@ class TradingAgentsGraph:
             self.invest_judge_memory,
             self.risk_manager_memory,
             self.conditional_logic,
+            self.memory_hub,
+            self._create_analyst_tool_llms(),
+            (
+                {
+                    "max_tokens": self.config["report_digest_max_tokens"],
+                    "full_text": self.config["report_digest_full_text"],
+                }
+                if self.config.get("report_digest", False)
+                else None
+            ),
+            (
+                self.config.get("compact_tool_results_chars", 2000)
+                if self.config.get("compact_tool_results", False)
+                else None
+            ),
         )
 
-        self.propagator = Propagator()
+        self.propagator = Propagator(self.config["max_recur_limit"])
+        self.metrics = (
+            MetricsRecorder() if self.config.get("instrumentation", True) else None
+        )
         self.reflector = Reflector(self.quick_thinking_llm)
-        self.signal_processor = SignalProcessor(self.quick_thinking_llm)
+        self.report_store = (
+            ReportStore(
+                self.config.get("report_store_dir")
+                or os.path.join(self.config["results_dir"], "report_store")
+            )
+            if self.config.get("incremental_reports", False)
+            else None
+        )
+        self.signal_processor = SignalProcessor(
+            self.quick_thinking_llm,
+            self.config.get("signal_min_confidence", 0.75),
+        )
 
         # State tracking
         self.curr_state = None
@@ -107,11 +151,93 @@ class TradingAgentsGraph:
         self.log_states_dict = {}  # date to full state dict
 
         # Set up the graph
-        self.graph = self.graph_setup.setup_graph(selected_analysts)
+        self.selected_analysts = list(selected_analysts)
+        self.graph = self.graph_setup.setup_graph(
+            selected_analysts, profile=self.config.get("graph_profile", "full")
+        )
+        # Analyst and decision halves of the graph, compiled on demand
+        self._stage_graphs = {}
 
-    def _create_tool_nodes(self) -> Dict[str, ToolNode]:
-        """Create tool nodes for different data sources."""
-        return {
+    def fork(self) -> "TradingAgentsGraph":
+        """Return a request-scoped handle sharing this graph's heavy components.
+
+        The compiled graph, LLM clients, tool nodes and memories are shared;
+        the per-run tracking state (curr_state, ticker, log_states_dict) is
+        fresh, so forks can propagate concurrently from different threads.
+        """
+        forked = copy.copy(self)
+        forked.curr_state = None
+        forked.ticker = None
+        forked.log_states_dict = {}
+        return forked
+
+    def _create_llm(self, model: str):
+        """Create a chat model for the configured provider.
+
+        Provider packages are imported here rather than at module level so
+        only the one in use is ever loaded.
+        """
+        provider = self.config["llm_provider"].lower()
+        # The scheduler retries failed requests itself, client retries on
+        # top would multiply the attempts
+        extra = {"max_retries": 0} if self.config.get("llm_scheduler", True) else {}
+        if provider in ("openai", "ollama", "openrouter"):
+            from langchain_openai import ChatOpenAI
+
+            # Usage of streamed calls is only reported when asked for
+            if self.config.get("llm_streaming"):
+                extra["stream_usage"] = True
+            return ChatOpenAI(model=model, base_url=self.config["backend_url"], **extra)
+        elif provider == "anthropic":
+            from langchain_anthropic import ChatAnthropic
+
+            return ChatAnthropic(model=model, base_url=self.config["backend_url"], **extra)
+        elif provider == "google":
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            return ChatGoogleGenerativeAI(model=model, **extra)
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.config['llm_provider']}")
+
+    def _create_analyst_tool_llms(self) -> Dict[str, Any]:
+        """Models for analyst tool-selection turns, per analyst type."""
+        routing = self.config.get("analyst_tool_llm") or {}
+        llms = {}
+        by_model = {}
+        for analyst in ("market", "social", "news", "fundamentals"):
+            model = routing.get(analyst, routing.get("default"))
+            if not model:
+                continue
+            if model not in by_model:
+                by_model[model] = self._schedule_llm(self._create_llm(model), model)
+            llms[analyst] = by_model[model]
+        return llms
+
+    def _schedule_llm(self, llm, model: str):
+        """Wrap llm so its requests share the process-wide rate limits."""
+        if not self.config.get("llm_scheduler", True):
+            return llm
+        scheduler = get_llm_scheduler()
+        scheduler.configure(self.config.get("llm_rate_limits", {}))
+        return ScheduledChatModel(
+            llm=llm,
+            scheduler=scheduler,
+            key=f"{self.config['llm_provider'].lower()}/{model}",
+            streaming=self.config.get("llm_streaming", False),
+            # Per model, so graphs with different settings don't override
+            # each other in the shared scheduler
+            max_retries=self.config.get("llm_max_retries"),
+            backoff=self.config.get("llm_retry_backoff"),
+        )
+
+    def _create_tool_nodes(self) -> Dict[str, Runnable]:
+        """Create tool nodes for different data sources.
+
+        When an analyst asks for several tools in one message, the calls run
+        concurrently on a thread pool bounded by tool_max_concurrency and
+        their results are returned in call order.
+        """
+        tool_nodes = {
             "market": ToolNode(
                 [
                     # online tools
@@ -153,38 +279,197 @@ class TradingAgentsGraph:
                 ]
             ),
         }
+        max_concurrency = self.config.get("tool_max_concurrency", 8)
+        return {
+            name: node.with_config(max_concurrency=max_concurrency)
+            for name, node in tool_nodes.items()
+        }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def propagate(self, company_name, trade_date, deadline=None):
+        """Run the trading agents graph for a company on a specific date.
+
+        Args:
+            company_name: Ticker to analyze
+            trade_date: Date to trade on
+            deadline: Seconds the run may take, overriding
+                config["run_deadline"]. Under a deadline the run degrades
+                instead of overrunning; final_state["deadline_report"] lists
+                what was skipped. An LLM call that is already running is
+                only cut off at the deadline with llm_scheduler enabled;
+                without it the run can overrun by one call.
+        """
 
         self.ticker = company_name
 
-        # Initialize state
-        init_agent_state = self.propagator.create_initial_state(
-            company_name, trade_date
+        if deadline is None:
+            deadline = self.config.get("run_deadline")
+        budget = None
+        if deadline:
+            budget = RunBudget(
+                deadline,
+                self.config.get("deadline_call_estimate", 10.0),
+                self.config.get("deadline_min_call_timeout", 5.0),
+                DECISION_CALLS[self.config.get("graph_profile", "full")],
+            )
+
+        init_agent_state, args, run_metrics = self._begin_run(
+            company_name, trade_date, budget
         )
-        args = self.propagator.get_graph_args()
 
-        if self.debug:
-            # Debug mode with tracing
-            trace = []
-            for chunk in self.graph.stream(init_agent_state, **args):
-                if len(chunk["messages"]) == 0:
-                    pass
+        start = time.perf_counter()
+        final_state = init_agent_state
+        # Dataflows and tools read this run's config, not a process global
+        with use_config(self.config), use_budget(budget):
+            try:
+                if self.debug:
+                    # Debug mode with tracing
+                    for final_state in self.graph.stream(init_agent_state, **args):
+                        if len(final_state["messages"]) != 0:
+                            final_state["messages"][-1].pretty_print()
+                elif budget is not None:
+                    # Streamed so the state reached so far survives the deadline
+                    for final_state in self.graph.stream(init_agent_state, **args):
+                        pass
                 else:
-                    chunk["messages"][-1].pretty_print()
-                    trace.append(chunk)
+                    # Standard mode without tracing
+                    final_state = self.graph.invoke(init_agent_state, **args)
+            except DeadlineExceeded:
+                final_state = self._decide_at_deadline(final_state, budget)
+            else:
+                if budget is not None and not self._has_reports(final_state):
+                    # Decided without any analyst input
+                    final_state = self._hold(final_state, budget, "no analyst wrote a report")
+
+        if budget is not None:
+            final_state["deadline_report"] = budget.to_dict()
+        return self._finish_run(trade_date, final_state, run_metrics, start)
+
+    def _decide_at_deadline(self, state, budget):
+        """Final decision of a run cut off by its deadline.
+
+        Falls back to the latest plan the run produced, or HOLD without one
+        or without any analyst report to base it on.
+        """
+        budget.skip("Graph", "stopped at the deadline")
+        # Fill in what the skipped nodes would have written
+        state = {"investment_plan": "", "trader_investment_plan": "", **state}
+        state["investment_debate_state"] = {
+            "bull_history": "",
+            "bear_history": "",
+            "judge_decision": "",
+            **state["investment_debate_state"],
+        }
+        state["risk_debate_state"] = {
+            "risky_history": "",
+            "safe_history": "",
+            "neutral_history": "",
+            "judge_decision": "",
+            **state["risk_debate_state"],
+        }
+        if not self._has_reports(state):
+            return self._hold(state, budget, "no analyst wrote a report")
+        if state.get("final_trade_decision"):
+            return state
+        for field, source in (
+            ("trader_investment_plan", "Trader"),
+            ("investment_plan", "Research Manager"),
+        ):
+            if state.get(field):
+                budget.skip("Risk Judge", f"used the plan of the {source}")
+                state["final_trade_decision"] = state[field]
+                return state
+        return self._hold(state, budget, "no plan was reached")
+
+    def _has_reports(self, state) -> bool:
+        return any(state.get(REPORT_FIELDS[analyst]) for analyst in self.selected_analysts)
+
+    def _hold(self, state, budget, reason):
+        budget.skip("Risk Judge", "defaulted to HOLD")
+        state["final_trade_decision"] = (
+            f"Within the {budget.seconds}s deadline {reason}."
+            "\n\nFINAL TRANSACTION PROPOSAL: **HOLD**"
+        )
+        return state
 
-            final_state = trace[-1]
-        else:
-            # Standard mode without tracing
-            final_state = self.graph.invoke(init_agent_state, **args)
+    def propagate_many(self, company_name, trade_dates, returns_fn=None, pipeline_depth=None):
+        """Run consecutive dates, overlapping analyst stages of upcoming dates.
+
+        See PipelinedBacktester; returns a list of (final_state, decision).
+        """
+        from .backtest import PipelinedBacktester
+
+        if pipeline_depth is None:
+            pipeline_depth = self.config.get("backtest_pipeline_depth", 2)
+        return PipelinedBacktester(self, pipeline_depth).run(
+            company_name, trade_dates, returns_fn
+        )
 
+    def get_stage_graph(self, stage: str):
+        """Compiled "analysts" or "decision" half of the graph."""
+        if stage not in self._stage_graphs:
+            self._stage_graphs[stage] = self.graph_setup.setup_graph(
+                self.selected_analysts,
+                stage=stage,
+                profile=self.config.get("graph_profile", "full"),
+            )
+        return self._stage_graphs[stage]
+
+    def _begin_run(self, company_name, trade_date, budget=None):
+        """Initial state, graph args and metrics of one run."""
+        init_agent_state = self.propagator.create_initial_state(
+            company_name, trade_date
+        )
+        if self.report_store is not None:
+            init_agent_state["previous_reports"] = self.report_store.get_previous(
+                company_name,
+                trade_date,
+                [
+                    analyst
+                    for analyst in self.selected_analysts
+                    if analyst in self.config["incremental_analysts"]
+                ],
+                self.config["incremental_max_gap_days"],
+                self.config["incremental_refresh_every"],
+            )
+        callbacks = []
+        run_metrics = None
+        if self.metrics is not None:
+            run_metrics, metrics_handler = self.metrics.start_run(
+                company_name, trade_date
+            )
+            callbacks.append(metrics_handler)
+        if budget is not None:
+            callbacks.append(BudgetCallbackHandler(budget))
+        args = self.propagator.get_graph_args(
+            callbacks,
+            run_metrics.run_id if run_metrics is not None else str(uuid.uuid4()),
+        )
+        return init_agent_state, args, run_metrics
+
+    def _finish_run(self, trade_date, final_state, run_metrics, start, save_reports=True):
+        """Record a finished run and extract its decision.
+
+        save_reports=False when the analyst stage already stored the reports.
+        """
         # Store current state for reflection
         self.curr_state = final_state
 
         # Log state
         self._log_state(trade_date, final_state)
+        if self.report_store is not None and save_reports:
+            self.report_store.save(
+                final_state["company_of_interest"],
+                trade_date,
+                final_state,
+                final_state.get("previous_reports") or {},
+            )
+
+        if run_metrics is not None:
+            run_metrics.wall_time = time.perf_counter() - start
+            self.metrics.export_json(
+                f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/metrics_{trade_date}.json",
+                run_metrics,
+            )
 
         # Return decision and processed signal
         return final_state, self.process_signal(final_state["final_trade_decision"])
@@ -219,6 +504,7 @@ class TradingAgentsGraph:
             },
             "investment_plan": final_state["investment_plan"],
             "final_trade_decision": final_state["final_trade_decision"],
+            "deadline_report": final_state.get("deadline_report") or {},
         }
 
         # Save to file
@@ -231,8 +517,44 @@ class TradingAgentsGraph:
         ) as f:
             json.dump(self.log_states_dict, f, indent=4)
 
+    def _get_memories(self) -> Dict[str, FinancialSituationMemory]:
+        """Map each reflected component to its memory."""
+        return {
+            "bull": self.bull_memory,
+            "bear": self.bear_memory,
+            "trader": self.trader_memory,
+            "invest_judge": self.invest_judge_memory,
+            "risk_manager": self.risk_manager_memory,
+        }
+
+    def _load_logged_state(self, trade_date) -> Dict[str, Any]:
+        """Load the logged state of a previous run for reflection."""
+        trade_date = str(trade_date)
+        if trade_date in self.log_states_dict:
+            logged = self.log_states_dict[trade_date]
+        else:
+            with open(
+                f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log_{trade_date}.json"
+            ) as f:
+                logged = json.load(f)[trade_date]
+
+        # The log stores the trader plan under a different key than AgentState
+        return {
+            **logged,
+            "trader_investment_plan": logged["trader_investment_decision"],
+        }
+
     def reflect_and_remember(self, returns_losses):
         """Reflect on decisions and update memory based on returns."""
+        if self.config.get("concurrent_reflection", True):
+            self.reflector.reflect_all(
+                self.curr_state,
+                returns_losses,
+                self._get_memories(),
+                self.config.get("reflection_max_concurrency", 5),
+            )
+            return
+
         self.reflector.reflect_bull_researcher(
             self.curr_state, returns_losses, self.bull_memory
         )
@@ -249,6 +571,22 @@ class TradingAgentsGraph:
             self.curr_state, returns_losses, self.risk_manager_memory
         )
 
+    def reflect_and_remember_many(self, dates_and_returns: List[Tuple[str, Any]]):
+        """Reflect on many logged runs at once, e.g. after a backtest.
+
+        Args:
+            dates_and_returns: List of (trade_date, returns_losses) pairs for
+                runs of the current ticker
+        """
+        self.reflector.reflect_many(
+            [
+                (self._load_logged_state(trade_date), returns_losses)
+                for trade_date, returns_losses in dates_and_returns
+            ],
+            self._get_memories(),
+            self.config.get("reflection_max_concurrency", 5),
+        )
+
     def process_signal(self, full_signal):
         """Process a signal to extract the core decision."""
         return self.signal_processor.process_signal(full_signal)
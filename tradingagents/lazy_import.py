@@ -0,0 +1,20 @@
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access.
+
+    Used for heavy dependencies (data vendors, LLM providers) that are only
+    needed once a tool or model is actually called, so importing the
+    framework stays fast in short-lived processes.
+    """
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """Return a proxy for module name that defers the import until first use."""
+    return LazyModule(name)